@@ -327,7 +327,9 @@ async def _get_parameters(
         if taxon_keys:
             params_updates.update(
                 {
-                    "taxonKey": [int(key) for key in taxon_keys],
+                    "taxonKey": list(
+                        dict.fromkeys(int(key) for key in taxon_keys.values())
+                    ),
                     "scientificName": None,
                 }
             )
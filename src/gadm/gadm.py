@@ -1,6 +1,11 @@
+import asyncio
+import functools
 import os
 import sqlite3
-from typing import List, Optional, Tuple
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
 from src.models.location import (
     Location,
     GADMHierarchy,
@@ -14,14 +19,131 @@ from src.log import logger
 HERE = os.path.dirname(os.path.abspath(__file__))
 GADM_GPKG_PATH = os.path.join(HERE, "gadm.gpkg")
 
+# Sidecar database holding the normalized name index (built on first use)
+GADM_INDEX_PATH = os.getenv(
+    "GADM_INDEX_PATH", os.path.join(HERE, "gadm_name_index.sqlite")
+)
+
+# Where the name index is built instead when GADM_INDEX_PATH's directory is
+# read-only (e.g. an installed package)
+GADM_INDEX_FALLBACK_PATH = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "gbif-agent",
+    "gadm_name_index.sqlite",
+)
+
+# Size of the per-connection prepared statement cache
+GADM_CACHED_STATEMENTS = 256
+
+# Bump when the name index schema changes so stale sidecars get rebuilt
+GADM_INDEX_VERSION = 3
+
+# GADM levels covered by the name index (matches GADMHierarchy)
+GADM_LEVELS = range(4)
+
+# Common projection of every layer: GID_0, NAME_0, ..., GID_3, NAME_3
+_HIERARCHY_COLUMNS = [
+    f"{kind}_{level}" for level in GADM_LEVELS for kind in ("GID", "NAME")
+]
+
+# Candidate name columns per level, in match priority order
+_NAME_COLUMNS: Dict[int, Tuple[str, ...]] = {
+    level: (f"NAME_{level}", f"VARNAME_{level}", f"NL_NAME_{level}")
+    for level in GADM_LEVELS
+}
+
+# Query trace entry: SQL text and its bound parameters, formatted lazily
+TraceEntry = Tuple[str, Dict[str, object]]
+
+# Hierarchy values in _HIERARCHY_COLUMNS order (GID_0, NAME_0, GID_1, ...),
+# possibly truncated after the deepest level selected. GID_n is at 2n and
+# NAME_n at 2n + 1.
+HierarchyRow = Tuple[Optional[str], ...]
+
+# A chain lookup result: number of steps matched and the deepest hierarchy
+ChainMatch = Tuple[int, HierarchyRow]
+
+# (level, place_name) pairs from least to most specific
+Steps = Tuple[Tuple[int, str], ...]
+
+# Chain lookup specialized for one chain shape (see _chain_finder)
+ChainFinder = Callable[..., Optional[ChainMatch]]
+
+# A chain still to resolve in SQLite: its steps and the GID bound above them
+ChainKey = Tuple[Steps, Optional[str]]
+
+# Hierarchy columns as selected from the name index
+_HIERARCHY_SELECT = ", ".join(f'"{c}"' for c in _HIERARCHY_COLUMNS)
+
+# Connection tuning for the read-only lookup workload. mmap_size and
+# cache_size (negative = KiB) are per schema, so they are applied to both
+# the GeoPackage and the attached name index.
+GADM_MMAP_SIZE = 1 << 30
+GADM_CACHE_SIZE_KIB = 65536
+
+
+def _parse_memory_max_level(value: str) -> int:
+    """Parse GADM_MEMORY_MAX_LEVEL, clamped to the indexed GADM levels."""
+    return min(max(int(value), GADM_LEVELS[0]), GADM_LEVELS[-1])
+
+
+# Deepest GADM level resolved from memory instead of SQLite (0=countries only,
+# 1 adds states). Each extra level trades RAM for fewer queries.
+GADM_MEMORY_MAX_LEVEL = _parse_memory_max_level(
+    os.getenv("GADM_MEMORY_MAX_LEVEL", "1")
+)
+
+# Locations resolved per batch by map_locations_to_gadm
+GADM_BATCH_SIZE = 500
+
+# Number of location hierarchies memoized across lookups
+GADM_LOOKUP_CACHE_SIZE = 4096
+
+# Worker threads used to resolve batches of locations
+GADM_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# SQLite's UPPER() only folds ASCII letters; cache keys must fold the same way
+_ASCII_UPPER = str.maketrans(string.ascii_lowercase, string.ascii_uppercase)
+
+# Read-only connections, one per thread. Bumping the generation makes every
+# thread reopen its connection on the next lookup.
+_LOCAL = threading.local()
+_CONN_LOCK = threading.Lock()
+_CONN_GENERATION = 0
+_OPEN_CONNECTIONS: List[sqlite3.Connection] = []
+_INDEX_READY = False
+
+# Name index in use, resolved by _ensure_index_ready
+_INDEX_PATH = GADM_INDEX_PATH
+
+# Name index entries for levels up to GADM_MEMORY_MAX_LEVEL, loaded with the
+# index and keyed by (level, name_upper, parent_gid). Unconstrained lookups use
+# parent_gid=None. Shallow levels are small and hit by nearly every location,
+# so they never go through SQLite.
+_MEMORY_INDEX: Dict[Tuple[int, str, Optional[str]], HierarchyRow] = {}
+
+# Worker pool for map_locations_to_gadm, started on first use
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
 
 def _open_gadm_connection(trace: bool = False) -> sqlite3.Connection:
     """Open read-only connection to GADM GeoPackage database."""
     if not os.path.exists(GADM_GPKG_PATH):
         raise FileNotFoundError(f"GADM file not found: {GADM_GPKG_PATH}")
 
-    conn = sqlite3.connect(f"file:{GADM_GPKG_PATH}?mode=ro", uri=True)
-    conn.row_factory = sqlite3.Row
+    conn = sqlite3.connect(
+        f"file:{GADM_GPKG_PATH}?mode=ro",
+        uri=True,
+        cached_statements=GADM_CACHED_STATEMENTS,
+        check_same_thread=False,
+    )
+    conn.execute("ATTACH DATABASE ? AS gadm_index", (f"file:{_INDEX_PATH}?mode=ro",))
+
+    conn.execute("PRAGMA query_only = 1")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    for schema in ("main", "gadm_index"):
+        conn.execute(f"PRAGMA {schema}.mmap_size = {GADM_MMAP_SIZE}")
+        conn.execute(f"PRAGMA {schema}.cache_size = -{GADM_CACHE_SIZE_KIB}")
 
     if trace:
         conn.set_trace_callback(print)
@@ -29,6 +151,69 @@ def _open_gadm_connection(trace: bool = False) -> sqlite3.Connection:
     return conn
 
 
+def _ensure_index_ready() -> None:
+    """Build the name index and load its in-memory part once per process."""
+    global _INDEX_READY, _INDEX_PATH
+
+    if _INDEX_READY:
+        return
+
+    with _CONN_LOCK:
+        if not _INDEX_READY:
+            _INDEX_PATH = _ensure_name_index()
+            _MEMORY_INDEX.clear()
+            _MEMORY_INDEX.update(_load_memory_index(_INDEX_PATH))
+            _INDEX_READY = True
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the GADM worker pool, starting it on first use."""
+    global _EXECUTOR
+
+    if _EXECUTOR is None:
+        with _CONN_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=GADM_MAX_WORKERS, thread_name_prefix="gadm"
+                )
+    return _EXECUTOR
+
+
+def _get_thread_connection() -> sqlite3.Connection:
+    """Return the calling thread's GADM connection, opening it on first use."""
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is not None and _LOCAL.generation == _CONN_GENERATION:
+        return conn
+
+    _ensure_index_ready()
+    conn = _open_gadm_connection()
+    with _CONN_LOCK:
+        _OPEN_CONNECTIONS.append(conn)
+        _LOCAL.conn = conn
+        _LOCAL.generation = _CONN_GENERATION
+
+    return conn
+
+
+def _close_connections() -> None:
+    """
+    Close every thread's GADM connection and drop memoized lookups.
+
+    Only safe while no lookups are in flight (e.g. between tests or after
+    swapping the GeoPackage).
+    """
+    global _CONN_GENERATION, _INDEX_READY
+
+    with _CONN_LOCK:
+        for conn in _OPEN_CONNECTIONS:
+            conn.close()
+        _OPEN_CONNECTIONS.clear()
+        _CONN_GENERATION += 1
+        _INDEX_READY = False
+        _MEMORY_INDEX.clear()
+        _find_chain_cached.cache_clear()
+
+
 def _get_feature_layers(conn: sqlite3.Connection) -> List[str]:
     """Retrieve all feature table names from the GeoPackage."""
     cur = conn.cursor()
@@ -36,88 +221,227 @@ def _get_feature_layers(conn: sqlite3.Connection) -> List[str]:
     return [row[0] for row in cur.fetchall()]
 
 
-def _get_table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
-    """Retrieve column names for a specific table."""
+def _get_table_columns(conn: sqlite3.Connection, table: str) -> FrozenSet[str]:
+    """Retrieve the set of column names for a specific table."""
     cur = conn.cursor()
     cur.execute(f'PRAGMA table_info("{table}")')
-    return [row[1] for row in cur.fetchall()]
+    return frozenset(row[1] for row in cur.fetchall())
 
 
-def _build_name_match_clause(
-    level: int, place_name: str, cols: List[str]
-) -> Tuple[str, List[str]]:
-    """
-    Build SQL WHERE clause for matching place name at a specific GADM level.
+def _name_columns(level: int, cols: FrozenSet[str]) -> List[str]:
+    """Return the NAME_n, VARNAME_n and NL_NAME_n columns present in a table."""
+    return [c for c in _NAME_COLUMNS[level] if c in cols]
 
-    Searches across NAME_n, VARNAME_n, and NL_NAME_n columns using
-    case-insensitive exact matching.
 
-    Args:
-        level: GADM level (0-3)
-        place_name: Name to search for
-        cols: Available columns in the table
+def _name_index_is_current(index_path: str) -> bool:
+    """Check that the name index exists, matches our schema and is not stale."""
+    if not os.path.exists(index_path):
+        return False
+    if os.path.getmtime(index_path) < os.path.getmtime(GADM_GPKG_PATH):
+        return False
 
-    Returns:
-        Tuple of (SQL clause, parameter list)
+    conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+    try:
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+    finally:
+        conn.close()
+    return version == GADM_INDEX_VERSION
+
+
+def _build_name_index_select(conn: sqlite3.Connection) -> Optional[str]:
     """
-    name_cols = [
-        c
-        for c in cols
-        if c in [f"NAME_{level}", f"VARNAME_{level}", f"NL_NAME_{level}"]
-    ]
+    Build one UNION ALL query over every (layer, level, name column) combination.
 
-    if not name_cols:
-        return "1=0", []  # No name columns for this level
+    Each branch projects its layer onto the common GID_n/NAME_n schema,
+    filling columns the layer lacks with NULL, and tags rows with the
+    layer's position so features keep the order they are searched in.
+    Returns None if no layer has anything to index.
+    """
+    branches = []
+    for layer_order, layer in enumerate(_get_feature_layers(conn)):
+        cols = _get_table_columns(conn, layer)
+        projection = ", ".join(
+            f'"{c}"' if c in cols else f'NULL AS "{c}"' for c in _HIERARCHY_COLUMNS
+        )
+        for level in GADM_LEVELS:
+            gid_col = f"GID_{level}"
+            if gid_col not in cols:
+                continue
+            parent_col = f"GID_{level - 1}"
+            parent_expr = (
+                f'"{parent_col}"' if level > 0 and parent_col in cols else "NULL"
+            )
+            for col in _name_columns(level, cols):
+                branches.append(
+                    f'SELECT UPPER("{col}") AS name_upper, {level} AS level, '
+                    f'"{gid_col}" AS gid, {parent_expr} AS parent_gid, '
+                    f"{projection}, '{layer}' AS layer, {layer_order} AS layer_order, "
+                    "rowid AS row_id "
+                    f'FROM gpkg."{layer}" '
+                    f'WHERE "{col}" IS NOT NULL AND "{gid_col}" IS NOT NULL '
+                    f"AND \"{gid_col}\" != ''"
+                )
 
-    predicates = [f'UPPER("{col}") = UPPER(?)' for col in name_cols]
-    params = [place_name] * len(name_cols)
+    return "\nUNION ALL\n".join(branches) if branches else None
 
-    return f"({' OR '.join(predicates)})", params
 
+def _ensure_name_index() -> str:
+    """
+    Build the GADM name index sidecar if it is missing or older than the GeoPackage.
 
-def _build_parent_constraint_clause(
-    level: int, parent_gid: Optional[str], cols: List[str]
-) -> Tuple[str, List[str]]:
+    Returns the path of the index. It lives at GADM_INDEX_PATH, or at
+    GADM_INDEX_FALLBACK_PATH when that directory is read-only and holds no
+    current index.
+
+    The index flattens every layer into one table with one row per distinct
+    upper-cased name variant, level, GID and parent GID. Each row carries
+    the full GID_0..3/NAME_0..3 hierarchy of its feature, so a lookup is a
+    single indexed seek on (level, name_upper, parent_gid) with no follow-up
+    fetch from the layer tables.
     """
-    Build SQL WHERE clause for parent GID constraint.
+    if not os.path.exists(GADM_GPKG_PATH):
+        raise FileNotFoundError(f"GADM file not found: {GADM_GPKG_PATH}")
 
-    Args:
-        level: Current GADM level
-        parent_gid: Parent's GID to constrain by
-        cols: Available columns in the table
+    if _name_index_is_current(GADM_INDEX_PATH):
+        return GADM_INDEX_PATH
 
-    Returns:
-        Tuple of (SQL clause, parameter list), or ("1=1", []) if no constraint
+    index_path = GADM_INDEX_PATH
+    if not os.access(os.path.dirname(index_path) or ".", os.W_OK):
+        index_path = GADM_INDEX_FALLBACK_PATH
+        if _name_index_is_current(index_path):
+            return index_path
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+
+    _build_name_index(index_path)
+    return index_path
+
+
+def _build_name_index(index_path: str) -> None:
+    """Write the name index to index_path, replacing any existing file."""
+    logger.info(f"GADM | Building name index at {index_path}")
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    hierarchy_defs = ", ".join(f'"{c}" TEXT' for c in _HIERARCHY_COLUMNS)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("DROP TABLE IF EXISTS gadm_name_index")
+        conn.execute(
+            f"""
+            CREATE TABLE gadm_name_index (
+                name_upper TEXT NOT NULL,
+                level INTEGER NOT NULL,
+                gid TEXT NOT NULL,
+                parent_gid TEXT,
+                {hierarchy_defs},
+                layer TEXT NOT NULL,
+                row_id INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "ATTACH DATABASE ? AS gpkg", (f"file:{GADM_GPKG_PATH}?mode=ro",)
+        )
+
+        union_sql = _build_name_index_select(conn)
+        if union_sql:
+            # Keep the first feature per group in layer order, and insert
+            # in that order so the index rowid ranks ambiguous names the way
+            # a layer-by-layer scan would find them.
+            conn.execute(
+                f"""
+                INSERT INTO gadm_name_index
+                SELECT name_upper, level, gid, parent_gid, {_HIERARCHY_SELECT},
+                       layer, row_id
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY name_upper, level, gid, parent_gid
+                        ORDER BY layer_order, row_id
+                    ) AS feature_rank
+                    FROM ({union_sql})
+                )
+                WHERE feature_rank = 1
+                ORDER BY layer_order, row_id
+                """
+            )
+
+        conn.execute(
+            "CREATE INDEX idx_gadm_name_lookup "
+            "ON gadm_name_index (level, name_upper, parent_gid)"
+        )
+        # Lookup connections are read-only and cannot run PRAGMA optimize,
+        # so gather planner statistics while the index is still writable
+        conn.execute("ANALYZE main")
+        conn.execute(f"PRAGMA user_version = {GADM_INDEX_VERSION}")
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, index_path)
+
+
+def _load_memory_index(
+    index_path: str,
+) -> Dict[Tuple[int, str, Optional[str]], HierarchyRow]:
     """
-    if not parent_gid or level == 0:
-        return "1=1", []
+    Read name index entries up to GADM_MEMORY_MAX_LEVEL into a lookup dict.
 
-    parent_col = f"GID_{level - 1}"
-    if parent_col not in cols:
-        # Parent column doesn't exist - signal no match possible
-        return "1=0", []
+    Rows are read in rowid order and the first entry per key wins. That is
+    exactly the entry the chain lookup's `... ORDER BY rowid LIMIT 1`
+    returns, with or without the parent constraint.
+    """
+    columns = ", ".join(
+        f'"{c}"' for c in _HIERARCHY_COLUMNS[: 2 * (GADM_MEMORY_MAX_LEVEL + 1)]
+    )
+    conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            f"SELECT level, name_upper, parent_gid, {columns} FROM gadm_name_index "
+            "WHERE level <= ? ORDER BY rowid",
+            (GADM_MEMORY_MAX_LEVEL,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    index: Dict[Tuple[int, str, Optional[str]], HierarchyRow] = {}
+    for row in rows:
+        level, name_upper, parent_gid = row[0], row[1], row[2]
+        values = row[3:]
+        index.setdefault((level, name_upper, None), values)
+        if parent_gid is not None:
+            index.setdefault((level, name_upper, parent_gid), values)
+    return index
+
+
+def _format_query(sql: str, params: Dict[str, object]) -> str:
+    """Inline bound parameters into SQL text for the query trace."""
+    for name, value in params.items():
+        sql = sql.replace(f":{name}", f"'{value}'")
+    return sql
 
-    return f'"{parent_col}" = ?', [parent_gid]
 
+def _format_trace(query_trace: Optional[List[TraceEntry]]) -> List[str]:
+    """Render collected (sql, params) trace entries as SQL text."""
+    if query_trace is None:
+        return []
+    return [_format_query(sql, params) for sql, params in query_trace]
 
-def _build_hierarchy_from_row(row: sqlite3.Row, max_level: int) -> GADMHierarchy:
+
+def _build_hierarchy_from_row(row: HierarchyRow, max_level: int) -> GADMHierarchy:
     """
     Extract GADM hierarchy from a database row.
 
     Args:
-        row: Database row containing GADM data
+        row: Hierarchy values (GID_0, NAME_0, ...) covering up to max_level
         max_level: Maximum level to extract (inclusive)
 
     Returns:
         GADMHierarchy object with levels 0 through max_level
     """
-    row_dict = dict(row)
     levels_kwargs = {}
 
     # Our hierarchy model supports levels 0..3
     for level in range(min(max_level, 3) + 1):
-        name = row_dict.get(f"NAME_{level}")
-        gid = row_dict.get(f"GID_{level}")
+        gid = row[2 * level]
+        name = row[2 * level + 1]
         if name or gid:
             levels_kwargs[f"level_{level}"] = GADMHierarchyLevel(
                 name=name,
@@ -127,108 +451,188 @@ def _build_hierarchy_from_row(row: sqlite3.Row, max_level: int) -> GADMHierarchy
     return GADMHierarchy(**levels_kwargs)
 
 
-def _find_place_in_layer(
-    conn: sqlite3.Connection,
-    layer: str,
-    level: int,
-    place_name: str,
-    parent_gid: Optional[str] = None,
-    query_trace: Optional[List[str]] = None,
-) -> Optional[sqlite3.Row]:
+@functools.lru_cache(maxsize=None)
+def _chain_sql(
+    depth: int, max_level: int, has_parent: bool, batch_rows: int = 0
+) -> str:
     """
-    Search for a place in a specific GADM layer at a given level.
-
-    Uses exact name matching with optional parent GID constraint for
-    hierarchical filtering.
-
-    Args:
-        conn: Database connection
-        layer: GADM layer (table) name
-        level: GADM level (0=country, 1=state, 2=county, 3=locality)
-        place_name: Name to search for
-        parent_gid: Optional parent's GID for hierarchical constraint
-        query_trace: Optional list to append executed SQL queries to
-
-    Returns:
-        Database row if found, None otherwise
+    Build the single-statement hierarchy walk for a chain of `depth` levels.
+
+    Step i picks the first index entry (in layer order, see
+    _ensure_name_index) matching level{i}/name{i} whose
+    parent_gid is the GID found at step i-1 (or the bound parent for the
+    first step when has_parent is set), mirroring the level-by-level
+    narrowing. A missed step leaves every later step NULL. The deepest
+    matched step is returned along with its GID_n/NAME_n hierarchy, or
+    no row at all when the first step misses. Only GID_0..max_level and
+    NAME_0..max_level are projected, since nothing deeper can be matched.
+
+    With batch_rows=0 the inputs are named parameters (:parent, :level1,
+    :name1, ...). Otherwise they come from a VALUES list of batch_rows
+    positional (loc_id, parent, level1, name1, ...) tuples, and each result
+    row is prefixed with the loc_id it answers.
     """
-    cols = _get_table_columns(conn, layer)
+    if batch_rows:
+        ref = "input.{}".format
+    else:
+        ref = ":{}".format
+
+    joins = []
+    for i in range(1, depth + 1):
+        if i > 1:
+            parent = f" AND parent_gid = s{i - 1}.gid"
+        else:
+            parent = f" AND parent_gid = {ref('parent')}" if has_parent else ""
+        joins.append(
+            f"LEFT JOIN gadm_index.gadm_name_index s{i} ON s{i}.rowid = ("
+            "SELECT rowid FROM gadm_index.gadm_name_index "
+            "INDEXED BY idx_gadm_name_lookup "
+            f"WHERE level = {ref(f'level{i}')} "
+            f"AND name_upper = UPPER({ref(f'name{i}')}){parent} "
+            "ORDER BY rowid LIMIT 1)"
+        )
 
-    # Build WHERE clause components
-    name_clause, name_params = _build_name_match_clause(level, place_name, cols)
-    parent_clause, parent_params = _build_parent_constraint_clause(
-        level, parent_gid, cols
+    steps = range(depth, 0, -1)
+    deepest_case = " ".join(f"WHEN s{i}.rowid IS NOT NULL THEN {i}" for i in steps)
+    deepest_rowid = ", ".join(f"s{i}.rowid" for i in steps)
+    if depth > 1:
+        deepest_rowid = f"COALESCE({deepest_rowid})"
+    columns = ", ".join(
+        f'hit."{c}" AS "{c}"' for c in _HIERARCHY_COLUMNS[: 2 * (max_level + 1)]
+    )
+    select = f"SELECT CASE {deepest_case} END AS depth, {columns} "
+    tail = (
+        f"{' '.join(joins)} "
+        f"JOIN gadm_index.gadm_name_index hit ON hit.rowid = {deepest_rowid}"
     )
 
-    # Check if search is viable
-    if name_clause == "1=0" or parent_clause == "1=0":
-        return None
+    if not batch_rows:
+        return f"{select}FROM (SELECT 1) AS seed {tail}"
+
+    input_columns = ["loc_id", "parent"]
+    for i in range(1, depth + 1):
+        input_columns += [f"level{i}", f"name{i}"]
+    values_row = f"({', '.join('?' * len(input_columns))})"
+    return (
+        f"WITH input({', '.join(input_columns)}) AS "
+        f"(VALUES {', '.join([values_row] * batch_rows)}) "
+        f"SELECT input.loc_id AS loc_id, {select[len('SELECT '):]}"
+        f"FROM input {tail}"
+    )
 
-    # Construct and execute query
-    where_sql = f"{name_clause} AND {parent_clause}"
-    sql = f'SELECT * FROM "{layer}" WHERE {where_sql} LIMIT 1'
-    params = name_params + parent_params
 
-    # Log query for debugging
-    if query_trace is not None:
-        query_str = sql
-        for param in params:
-            query_str = query_str.replace('?', f"'{param}'", 1)
-        query_trace.append(query_str)
+@functools.lru_cache(maxsize=None)
+def _chain_finder(depth: int, max_level: int, has_parent: bool) -> ChainFinder:
+    """
+    Specialize the chain lookup for one chain shape.
 
-    cur = conn.cursor()
-    cur.execute(sql, params)
-    row = cur.fetchone()
+    The SQL text and the bound parameter names are computed once and
+    captured by the returned closure, so a lookup only binds values and
+    executes. See _find_chain for the closure's arguments and result.
+    """
+    sql = _chain_sql(depth, max_level, has_parent)
+    param_names = tuple((f"level{i}", f"name{i}") for i in range(1, depth + 1))
+
+    def find(
+        conn: sqlite3.Connection,
+        steps: Steps,
+        parent_gid: Optional[str],
+        query_trace: Optional[List[TraceEntry]],
+    ) -> Optional[ChainMatch]:
+        params = {"parent": parent_gid} if has_parent else {}
+        for (level_param, name_param), (level, place_name) in zip(param_names, steps):
+            params[level_param] = level
+            params[name_param] = place_name
 
-    if not row:
-        return None
+        # Log query for debugging
+        if query_trace is not None:
+            query_trace.append((sql, params))
 
-    # Validate that the matched row has a GID for this level
-    row_dict = dict(row)
-    gid = row_dict.get(f"GID_{level}")
-    if not gid:
-        return None
+        row = conn.execute(sql, params).fetchone()
+        return (row[0], row[1:]) if row else None
 
-    return row
+    return find
 
 
-def _find_place_across_layers(
+def _find_chain(
     conn: sqlite3.Connection,
-    layers: List[str],
-    level: int,
-    place_name: str,
+    steps: Steps,
     parent_gid: Optional[str] = None,
-    query_trace: Optional[List[str]] = None,
-) -> Optional[sqlite3.Row]:
+    query_trace: Optional[List[TraceEntry]] = None,
+) -> Optional[ChainMatch]:
     """
-    Search for a place across all GADM layers at a given level.
-
-    Tries each layer until a match is found.
+    Resolve a whole location hierarchy against the name index in one query.
 
     Args:
         conn: Database connection
-        layers: List of layer names to search
-        level: GADM level to search at
-        place_name: Name to search for
-        parent_gid: Optional parent GID constraint
-        query_trace: Optional query trace list
+        steps: (level, place_name) pairs from least to most specific
+        parent_gid: Optional GID constraining the first step
+        query_trace: Optional list to append the executed (sql, params) to
 
     Returns:
-        First matching row found, or None
+        (depth, hierarchy) with the number of steps matched and GID_n/NAME_n
+        values up to the most specific requested level, or None if the
+        first step did not match
     """
-    for layer in layers:
-        row = _find_place_in_layer(
-            conn, layer, level, place_name, parent_gid, query_trace
-        )
-        if row:
-            return row
+    find = _chain_finder(len(steps), steps[-1][0], parent_gid is not None)
+    return find(conn, steps, parent_gid, query_trace)
+
+
+@functools.lru_cache(maxsize=GADM_LOOKUP_CACHE_SIZE)
+def _find_chain_cached(
+    steps: Steps, parent_gid: Optional[str] = None
+) -> Optional[ChainMatch]:
+    """
+    Memoized _find_chain on the calling thread's connection.
+
+    Names in steps must be ASCII upper-cased (see _ASCII_UPPER) so that keys
+    collapse exactly where SQLite's UPPER() comparison does.
+    """
+    return _find_chain(_get_thread_connection(), steps, parent_gid)
+
+
+def _find_chains_batch(
+    conn: sqlite3.Connection, chains: List[ChainKey]
+) -> Dict[ChainKey, ChainMatch]:
+    """
+    Resolve many (steps, parent_gid) chains with one query per chain shape.
+
+    Chains are grouped by (length, deepest level, whether a parent is
+    bound) and fed to the chain statement through a VALUES list, chunked
+    to stay under the connection's bound-parameter limit.
 
-    return None
+    Returns:
+        (depth, hierarchy) matches (see _find_chain) for the chains that
+        matched
+    """
+    groups: Dict[Tuple[int, int, bool], List[ChainKey]] = {}
+    for chain in chains:
+        steps, parent_gid = chain
+        shape = (len(steps), steps[-1][0], parent_gid is not None)
+        groups.setdefault(shape, []).append(chain)
+
+    max_params = conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    matches: Dict[ChainKey, ChainMatch] = {}
+    for (depth, max_level, has_parent), group in groups.items():
+        chunk_size = max(1, min(GADM_BATCH_SIZE, max_params // (2 + 2 * depth)))
+        for start in range(0, len(group), chunk_size):
+            chunk = group[start : start + chunk_size]
+            params: List[object] = []
+            for loc_id, (steps, parent_gid) in enumerate(chunk):
+                params += (loc_id, parent_gid)
+                for step in steps:
+                    params += step
+            sql = _chain_sql(depth, max_level, has_parent, len(chunk))
+            for row in conn.execute(sql, params):
+                loc_id, matched_depth, *values = row
+                matches[chunk[loc_id]] = (matched_depth, tuple(values))
+
+    return matches
 
 
 def _create_match_result(
     achieved_level: Optional[int],
-    achieved_row: Optional[sqlite3.Row],
+    achieved_row: Optional[HierarchyRow],
     expected_level: int,
     query_trace: List[str],
 ) -> GADMMatch:
@@ -237,9 +641,9 @@ def _create_match_result(
 
     Args:
         achieved_level: Deepest level successfully matched
-        achieved_row: Database row for the achieved level
+        achieved_row: Hierarchy values for the achieved level
         expected_level: Most specific level that was requested
-        query_trace: List of executed SQL queries
+        query_trace: Formatted SQL queries, empty when not tracing
 
     Returns:
         GADMMatch with appropriate match type and hierarchy
@@ -269,7 +673,7 @@ def perform_match(location: Location, trace: bool = False) -> GADMMatch:
     """
     Resolve a location address to GADM identifiers using hierarchical narrowing.
 
-    Strategy:
+    Strategy (executed as one SQL statement, see _chain_sql):
         1. Start from least specific level (country)
         2. Find exact match and extract its GID
         3. Use that GID to constrain search at next level (state)
@@ -289,86 +693,228 @@ def perform_match(location: Location, trace: bool = False) -> GADMMatch:
     Returns:
         GADMMatch with the deepest level successfully matched.
         Match type indicates COMPLETE if all levels matched, PARTIAL if some matched,
-        or NONE if no match found. The query_trace contains all executed SQL.
+        or NONE if no match found. With trace=True, query_trace contains all
+        executed SQL; otherwise it is empty.
     """
-    conn = _open_gadm_connection(trace=trace)
-    try:
-        # Get available layers and prepare hierarchy
-        layers = _get_feature_layers(conn)
-        original_hierarchy = location.get_hierarchy()
-        query_trace = []
-
-        if not original_hierarchy:
-            return GADMMatch(
-                match_type=GadmMatchType.NONE,
-                gadm_hierarchy=None,
-                query_trace=query_trace,
-            )
+    _ensure_index_ready()
 
-        # Reverse hierarchy to search from least to most specific
-        # Original: [(3, 'locality', 'X'), (2, 'county', 'Y'), (1, 'state', 'Z'), (0, 'country', 'W')]
-        # Reversed: [(0, 'country', 'W'), (1, 'state', 'Z'), (2, 'county', 'Y'), (3, 'locality', 'X')]
-        hierarchy = list(reversed(original_hierarchy))
+    if trace:
+        # Tracing installs a callback on the connection, so use a private one
+        # and bypass the lookup cache so every query shows up in the trace
+        conn = _open_gadm_connection(trace=True)
+        try:
+            return _match_location(location, conn)
+        finally:
+            conn.close()
 
-        # Track progress through hierarchy
-        current_parent_gid = None
-        achieved_level: Optional[int] = None
-        achieved_row: Optional[sqlite3.Row] = None
+    return _match_location(location)
 
-        # Iteratively narrow search through each hierarchy level
-        for level, level_name, place_name in hierarchy:
-            # Skip continent level (not in GADM)
-            if level_name == "continent":
-                continue
 
-            # Search across all layers for this level
-            matched_row = _find_place_across_layers(
-                conn, layers, level, place_name, current_parent_gid, query_trace
+def _location_steps(location: Location) -> Steps:
+    """(level, place_name) pairs from least to most specific."""
+    return tuple(
+        (level, place_name)
+        for level, _, place_name in location.iter_hierarchy_ascending()
+    )
+
+
+def _fold_steps(steps: Steps) -> Steps:
+    """ASCII upper-case step names so cache keys match SQLite's UPPER()."""
+    return tuple((level, name.translate(_ASCII_UPPER)) for level, name in steps)
+
+
+def _resolve_shallow(
+    steps: Steps,
+) -> Tuple[Optional[int], Optional[HierarchyRow], Optional[str], Steps]:
+    """
+    Walk the leading steps that fall within GADM_MEMORY_MAX_LEVEL in memory.
+
+    Returns:
+        (achieved_level, achieved_row, parent_gid, remaining_steps). The
+        remaining steps still need SQLite; they are empty when every step
+        was resolved in memory or a miss ended the walk.
+    """
+    achieved_level: Optional[int] = None
+    achieved_row: Optional[HierarchyRow] = None
+    parent_gid: Optional[str] = None
+
+    resolved = 0
+    for level, place_name in steps:
+        if level > GADM_MEMORY_MAX_LEVEL:
+            break
+        key = (level, place_name.translate(_ASCII_UPPER), parent_gid)
+        row = _MEMORY_INDEX.get(key)
+        if row is None:
+            # No match found - stop here and return what we have
+            return achieved_level, achieved_row, parent_gid, ()
+        achieved_level = level
+        achieved_row = row
+        parent_gid = row[2 * level]
+        resolved += 1
+
+    return achieved_level, achieved_row, parent_gid, steps[resolved:]
+
+
+def _match_location(
+    location: Location, conn: Optional[sqlite3.Connection] = None
+) -> GADMMatch:
+    """
+    Walk the location hierarchy (see perform_match).
+
+    With a connection, the hierarchy is queried on it and traced; without
+    one, the lookup goes through the memoized per-thread path.
+    """
+    # Only traced matches collect queries; entries are formatted at the end
+    query_trace: Optional[List[TraceEntry]] = [] if conn is not None else None
+
+    # e.g. ((0, 'USA'), (1, 'Florida'), (2, 'Alachua'))
+    steps = _location_steps(location)
+    if not steps:
+        return GADMMatch(
+            match_type=GadmMatchType.NONE,
+            gadm_hierarchy=None,
+            query_trace=_format_trace(query_trace),
+        )
+
+    expected_level = steps[-1][0]  # Most specific level requested
+
+    # Shallow levels are resolved from memory; only deeper levels reach SQLite
+    achieved_level, achieved_row, parent_gid, remaining = _resolve_shallow(steps)
+
+    if remaining:
+        # Narrow through the remaining levels in a single query
+        if conn is None:
+            chain_row = _find_chain_cached(_fold_steps(remaining), parent_gid)
+        else:
+            chain_row = _find_chain(conn, remaining, parent_gid, query_trace)
+
+        if chain_row:
+            depth, achieved_row = chain_row
+            achieved_level = remaining[depth - 1][0]
+
+    # Build final result
+    return _create_match_result(
+        achieved_level, achieved_row, expected_level, _format_trace(query_trace)
+    )
+
+
+def _match_locations(locations: List[Location]) -> List[GADMMatch]:
+    """
+    Match a batch of locations, as perform_match would one by one.
+
+    Shallow levels come from memory per location. The deeper remainders are
+    de-duplicated and resolved together with _find_chains_batch, so the
+    whole batch costs one query per chain shape instead of one per location.
+    """
+    _ensure_index_ready()
+
+    matches: List[Optional[GADMMatch]] = [None] * len(locations)
+    # Locations waiting on each chain: (index, achieved level/row, expected level)
+    pending: Dict[
+        ChainKey, List[Tuple[int, Optional[int], Optional[HierarchyRow], int]]
+    ] = {}
+
+    for i, location in enumerate(locations):
+        steps = _location_steps(location)
+        if not steps:
+            matches[i] = GADMMatch(match_type=GadmMatchType.NONE)
+            continue
+
+        expected_level = steps[-1][0]
+        achieved_level, achieved_row, parent_gid, remaining = _resolve_shallow(steps)
+        if not remaining:
+            matches[i] = _create_match_result(
+                achieved_level, achieved_row, expected_level, []
             )
+            continue
 
-            if not matched_row:
-                # No match found - stop here and return what we have
-                break
+        pending.setdefault((_fold_steps(remaining), parent_gid), []).append(
+            (i, achieved_level, achieved_row, expected_level)
+        )
 
-            # Update tracking for next iteration
-            achieved_level = level
-            achieved_row = matched_row
-            current_parent_gid = dict(matched_row).get(f"GID_{level}")
+    chain_rows = (
+        _find_chains_batch(_get_thread_connection(), list(pending)) if pending else {}
+    )
+    for chain, waiting in pending.items():
+        remaining, _ = chain
+        chain_row = chain_rows.get(chain)
+        for i, achieved_level, achieved_row, expected_level in waiting:
+            if chain_row:
+                depth, achieved_row = chain_row
+                achieved_level = remaining[depth - 1][0]
+            matches[i] = _create_match_result(
+                achieved_level, achieved_row, expected_level, []
+            )
 
-        # Build final result
-        expected_level = original_hierarchy[0][0]  # Most specific level requested
-        return _create_match_result(
-            achieved_level, achieved_row, expected_level, query_trace
+    return matches
+
+
+def _resolve_location(loc: Location) -> ResolvedLocation:
+    """Match one location to GADM, falling back to a NONE match on errors."""
+    try:
+        gadm_match: GADMMatch = perform_match(loc, trace=False)
+        resolved = ResolvedLocation.from_parts(loc, gadm_match)
+        if gadm_match.match_type == GadmMatchType.NONE:
+            logger.warning(f"GADM | Location not found: {loc}")
+        else:
+            logger.info(f"GADM | Resolved {loc} → {gadm_match.match_type}")
+        return resolved
+    except Exception as e:
+        logger.error(f"GADM | Error validating {loc}: {str(e)}")
+        return ResolvedLocation.from_parts(
+            loc, GADMMatch(match_type=GadmMatchType.NONE)
         )
 
-    finally:
-        conn.close()
+
+def _resolve_batch(locations: List[Location]) -> List[ResolvedLocation]:
+    """Resolve a batch of locations, falling back to one-by-one on errors."""
+    try:
+        matches = _match_locations(locations)
+    except Exception as e:
+        logger.error(f"GADM | Batch of {len(locations)} failed, retrying singly: {e}")
+        return [_resolve_location(loc) for loc in locations]
+
+    resolved = []
+    found: List[str] = []
+    missing: List[str] = []
+    for loc, gadm_match in zip(locations, matches):
+        if gadm_match.match_type == GadmMatchType.NONE:
+            missing.append(str(loc))
+        else:
+            found.append(f"{loc} → {gadm_match.match_type}")
+        resolved.append(ResolvedLocation.from_parts(loc, gadm_match))
+
+    # One log record per batch rather than one per location
+    if found:
+        logger.info(f"GADM | Resolved {len(found)} location(s): {'; '.join(found)}")
+    if missing:
+        logger.warning(
+            f"GADM | {len(missing)} location(s) not found: {'; '.join(missing)}"
+        )
+    return resolved
 
 
 async def map_locations_to_gadm(
     locations: list[Location],
 ) -> list[ResolvedLocation]:
-    matched_locations: list[ResolvedLocation] = []
-    for loc in locations:
-        try:
-            gadm_match: GADMMatch = perform_match(loc, trace=False)
-            resolved = ResolvedLocation(**loc.model_dump(), **gadm_match.model_dump())
-            if gadm_match.match_type == GadmMatchType.NONE:
-                logger.warning(f"GADM | Location not found: {loc}")
-            else:
-                logger.info(f"GADM | Resolved {loc} → {gadm_match.match_type}")
-
-            matched_locations.append(resolved)
-        except Exception as e:
-            logger.error(f"GADM | Error validating {loc}: {str(e)}")
-            matched_locations.append(
-                ResolvedLocation(
-                    **loc.model_dump(),
-                    **GADMMatch(match_type=GadmMatchType.NONE).model_dump(),
-                )
-            )
+    """
+    Resolve locations to GADM in batches on the GADM worker pool.
 
-    return matched_locations
+    Each batch of GADM_BATCH_SIZE locations is resolved with a handful of
+    queries (see _match_locations); batches run concurrently and results
+    keep the input order.
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    batches = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                executor, _resolve_batch, locations[start : start + GADM_BATCH_SIZE]
+            )
+            for start in range(0, len(locations), GADM_BATCH_SIZE)
+        )
+    )
+    return [resolved for batch in batches for resolved in batch]
 
 
 def serialize_locations(locations: list[ResolvedLocation]) -> list[dict]:
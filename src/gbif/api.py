@@ -2,8 +2,12 @@
 GBIF API URL Builder Module
 """
 
-from typing import Dict, Any
-from urllib.parse import urlencode
+from enum import Enum
+from functools import lru_cache
+from operator import attrgetter
+from types import NoneType, UnionType
+from typing import Any, Callable, Dict, List, Tuple, Union, get_args, get_origin
+from urllib.parse import parse_qsl, urlencode
 from uuid import UUID
 
 from src.models.entrypoints import (
@@ -19,6 +23,126 @@ from src.models.entrypoints import (
 from src.models.registry import GBIFGrSciCollInstitutionSearchParams
 
 
+def _bool_to_api_value(value: bool) -> str:
+    return "true" if value else "false"
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _to_api_value(value: Any) -> Any:
+    """
+    Convert a value whose field annotation does not pin down its type.
+
+    Enums become their value, UUIDs strings and bools "true"/"false";
+    list items are converted one by one.
+    """
+    if isinstance(value, list):
+        return [_to_api_value(item) for item in value]
+    if hasattr(value, "value"):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, bool):
+        return _bool_to_api_value(value)
+    return value
+
+
+def _annotation_converter(annotation: Any) -> Callable[[Any], Any]:
+    """Pick the conversion for a field from its type annotation."""
+    if get_origin(annotation) in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(args) != 1:
+            return _to_api_value
+        annotation = args[0]
+
+    if get_origin(annotation) is list:
+        (item_annotation,) = get_args(annotation) or (Any,)
+        convert_item = _annotation_converter(item_annotation)
+        return lambda items: [convert_item(item) for item in items]
+
+    if isinstance(annotation, type):
+        if issubclass(annotation, Enum):
+            return attrgetter("value")
+        if issubclass(annotation, UUID):
+            return str
+        if annotation is bool:
+            return _bool_to_api_value
+        if annotation in (str, int, float):
+            return _identity
+    return _to_api_value
+
+
+@lru_cache(maxsize=None)
+def _compile_converter(
+    model_cls: type,
+) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Build a converter from model_dump(by_alias=True) output to API params.
+
+    Field annotations are inspected once per model class. This is the only
+    conversion table; fields whose annotation is ambiguous (Any, or a union
+    of several types) and unknown keys are converted per value.
+    """
+    converters = {
+        field.serialization_alias or field.alias or name: _annotation_converter(
+            field.annotation
+        )
+        for name, field in model_cls.model_fields.items()
+    }
+
+    def convert(dumped: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: converters.get(key, _to_api_value)(value)
+            for key, value in dumped.items()
+        }
+
+    return convert
+
+
+# Pagination params change from page to page; everything else is encoded once
+_VOLATILE_PARAMS = frozenset({"limit", "offset"})
+
+
+@lru_cache(maxsize=1024)
+def _encode_stable_param(key: str, value: Any) -> str:
+    return urlencode({key: value}, doseq=True)
+
+
+def _encode_query(api_params: Dict[str, Any]) -> str:
+    """
+    urlencode(api_params, doseq=True), memoizing the non-pagination params.
+
+    Paging through results only changes limit/offset, so every other param
+    is encoded once and reused for every page. Params keep their order.
+    """
+    parts = []
+    for key, value in api_params.items():
+        if key in _VOLATILE_PARAMS:
+            # Plain integers need no quoting
+            parts.append(f"{key}={value}")
+        else:
+            value = tuple(value) if isinstance(value, list) else value
+            encoded = _encode_stable_param(key, value)
+            if encoded:
+                parts.append(encoded)
+    return "&".join(parts)
+
+
+# Query params that only make sense for the API, not the portal
+_PORTAL_EXCLUDED_PARAMS = frozenset(
+    {
+        "limit",
+        "facet",
+        "facetLimit",
+        "facetOffset",
+        "facetMinCount",
+        "facetMultiselect",
+    }
+)
+
+
 class GbifApi:
     def __init__(self):
         self.base_url = "https://api.gbif.org/v1"
@@ -26,55 +150,45 @@ class GbifApi:
         self.portal_url = "https://gbif.org"
 
     def _convert_to_api_params(self, params) -> Dict[str, Any]:
-        api_params = {}
-
-        for field_name, value in params.model_dump(by_alias=True).items():
-            if value is None:
-                continue
-
-            if isinstance(value, list):
-                processed_values = []
-                for item in value:
-                    if hasattr(item, "value"):
-                        processed_values.append(item.value)
-                    elif isinstance(item, UUID):
-                        processed_values.append(str(item))
-                    elif isinstance(item, bool):
-                        processed_values.append(str(item).lower())
-                    else:
-                        processed_values.append(item)
-                api_params[field_name] = processed_values
-            elif hasattr(value, "value"):
-                api_params[field_name] = value.value
-            elif isinstance(value, UUID):
-                api_params[field_name] = str(value)
-            elif isinstance(value, bool):
-                api_params[field_name] = str(value).lower()
-            else:
-                api_params[field_name] = value
-
-        return api_params
+        convert = _compile_converter(type(params))
+        return convert(params.model_dump(by_alias=True, exclude_none=True))
 
     def build_occurrence_search_url(self, params: GBIFOccurrenceSearchParams) -> str:
         api_params = self._convert_to_api_params(params)
-        query_string = urlencode(api_params, doseq=True)
+        query_string = _encode_query(api_params)
         return f"{self.base_url}/occurrence/search?{query_string}"
 
+    def build_occurrence_search_url_template(
+        self, params: GBIFOccurrenceSearchParams
+    ) -> str:
+        """
+        Occurrence search URL without limit/offset, ending in "?" or "&".
+
+        Pages are requested with f"{template}limit={limit}&offset={offset}",
+        so the rest of the query is encoded once for all pages.
+        """
+        api_params = self._convert_to_api_params(params)
+        for key in _VOLATILE_PARAMS:
+            api_params.pop(key, None)
+        query_string = _encode_query(api_params)
+        separator = "&" if query_string else ""
+        return f"{self.base_url}/occurrence/search?{query_string}{separator}"
+
     def build_occurrence_facets_url(self, params: GBIFOccurrenceFacetsParams) -> str:
         api_params = self._convert_to_api_params(params)
         api_params["limit"] = 0
-        query_string = urlencode(api_params, doseq=True)
+        query_string = _encode_query(api_params)
         return f"{self.base_url}/occurrence/search?{query_string}"
 
     def build_species_search_url(self, params: GBIFSpeciesSearchParams) -> str:
         api_params = self._convert_to_api_params(params)
-        query_string = urlencode(api_params, doseq=True)
+        query_string = _encode_query(api_params)
         return f"{self.base_url}/species/search?{query_string}"
 
     def build_species_facets_url(self, params: GBIFSpeciesFacetsParams) -> str:
         api_params = self._convert_to_api_params(params)
         api_params["limit"] = 0
-        query_string = urlencode(api_params, doseq=True)
+        query_string = _encode_query(api_params)
         return f"{self.base_url}/species/search?{query_string}"
 
     def build_species_key_search_url(self, usage_key: int) -> str:
@@ -105,7 +219,7 @@ class GbifApi:
     def build_species_match_url(self, params: GBIFSpeciesNameMatchParams) -> str:
         base_url = f"{self.v2_base_url}/species/match"
         api_params = self._convert_to_api_params(params)
-        query_string = urlencode(api_params, doseq=True)
+        query_string = _encode_query(api_params)
         return f"{base_url}?{query_string}"
 
     def build_occurrence_by_id_url(self, params: GBIFOccurrenceByIdParams) -> str:
@@ -115,50 +229,39 @@ class GbifApi:
 
     def build_dataset_search_url(self, params: GBIFDatasetSearchParams) -> str:
         api_params = self._convert_to_api_params(params)
-        query_string = urlencode(api_params, doseq=True)
+        query_string = _encode_query(api_params)
         return f"{self.base_url}/dataset/search?{query_string}"
 
     def build_grscicoll_institution_search_url(
         self, params: GBIFGrSciCollInstitutionSearchParams
     ) -> str:
         api_params = self._convert_to_api_params(params)
-        query_string = urlencode(api_params, doseq=True)
+        query_string = _encode_query(api_params)
         return f"{self.base_url}/grscicoll/institution/search?{query_string}"
 
     def build_portal_url(self, api_url: str) -> str:
         """Convert an API URL to its corresponding portal URL by removing facet parameters."""
         # Split URL into base and query string
-        base_part, *query_part = api_url.split("?")
+        base_part, _, query = api_url.partition("?")
 
         # Replace API base URL with portal URL base
         portal_base = base_part.replace(self.base_url, self.portal_url)
 
         # If no query parameters, return just the base
-        if not query_part:
+        if not query:
             return portal_base
 
-        # Parse query string into dictionary
-        from urllib.parse import parse_qs
-
-        params = parse_qs(query_part[0])
-
-        # Remove facet-related and limit=0 parameters
-        params_to_remove = [
-            "limit",
-            "facet",
-            "facetLimit",
-            "facetOffset",
-            "facetMinCount",
-            "facetMultiselect",
-        ]
-        for param in params_to_remove:
-            params.pop(param, None)
+        # Parse the query string in one pass, dropping facet-related and
+        # limit=0 parameters and grouping repeated keys
+        params: Dict[str, List[str]] = {}
+        for key, value in parse_qsl(query):
+            if key not in _PORTAL_EXCLUDED_PARAMS:
+                params.setdefault(key, []).append(value)
 
         # Reconstruct query string from remaining parameters
         if params:
             query_string = "&".join(
-                f"{key}={value[0]}" if len(value) == 1 else f"{key}={','.join(value)}"
-                for key, value in params.items()
+                f"{key}={','.join(values)}" for key, values in params.items()
             )
             return f"{portal_base}?{query_string}"
 
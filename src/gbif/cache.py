@@ -0,0 +1,159 @@
+"""
+Persistent cache for GBIF lookups whose answers rarely change.
+
+Species match and species key responses are stored in a small SQLite file,
+keyed by request URL, so warm runs skip the network. Only successful
+responses are stored. Cache errors are logged and otherwise ignored.
+
+The cache is opt-in: set GBIF_CACHE_PATH to a writable file to enable it.
+SQLite calls run in a worker thread so they never block the event loop.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from src.gbif.fetch import execute_request, execute_multiple_requests
+from src.log import logger
+
+# Path of the on-disk cache; empty (the default) disables it
+GBIF_CACHE_PATH = os.getenv("GBIF_CACHE_PATH", "")
+
+# Default lifetime of a cached response, in seconds
+GBIF_CACHE_TTL = float(os.getenv("GBIF_CACHE_TTL", str(24 * 60 * 60)))
+
+_CONN: Optional[sqlite3.Connection] = None
+_CONN_PATH: Optional[str] = None
+_CONN_LOCK = threading.Lock()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    path = os.path.expanduser(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS responses "
+        "(url TEXT PRIMARY KEY, expires_at REAL NOT NULL, body TEXT NOT NULL)"
+    )
+    conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+    return conn
+
+
+def _get_connection() -> Optional[sqlite3.Connection]:
+    """Return the cache connection, or None if the cache is disabled or broken."""
+    global _CONN, _CONN_PATH
+
+    if not GBIF_CACHE_PATH:
+        return None
+    if _CONN is None or _CONN_PATH != GBIF_CACHE_PATH:
+        _close_connection()
+        try:
+            _CONN = _connect(GBIF_CACHE_PATH)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"GBIF cache | Could not open {GBIF_CACHE_PATH}: {e}")
+            return None
+        _CONN_PATH = GBIF_CACHE_PATH
+    return _CONN
+
+
+def _close_connection() -> None:
+    global _CONN, _CONN_PATH
+
+    if _CONN is not None:
+        _CONN.close()
+    _CONN = None
+    _CONN_PATH = None
+
+
+def _lookup(urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Return the unexpired stored responses for urls, by URL."""
+    with _CONN_LOCK:
+        conn = _get_connection()
+        if conn is None:
+            return {}
+        now = time.time()
+        rows = []
+        try:
+            for url in urls:
+                rows += conn.execute(
+                    "SELECT url, body FROM responses WHERE url = ? AND expires_at > ?",
+                    (url, now),
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"GBIF cache | Lookup failed: {e}")
+            return {}
+    return {url: json.loads(body) for url, body in rows}
+
+
+def _store(responses: Dict[str, Dict[str, Any]], ttl: Optional[float]) -> None:
+    """Store successful responses, by URL, for ttl seconds."""
+    if ttl is None:
+        ttl = GBIF_CACHE_TTL
+    expires_at = time.time() + ttl
+    with _CONN_LOCK:
+        conn = _get_connection()
+        if conn is None:
+            return
+        try:
+            # One transaction for the batch; the connection is in autocommit mode
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                [
+                    (url, expires_at, json.dumps(response))
+                    for url, response in responses.items()
+                ],
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.warning(f"GBIF cache | Store failed: {e}")
+
+
+async def cached_execute_request(
+    url: str, ttl: Optional[float] = None
+) -> Dict[str, Any]:
+    """execute_request, answered from the on-disk cache when possible."""
+    if not GBIF_CACHE_PATH:
+        return await execute_request(url)
+
+    cached = await asyncio.to_thread(_lookup, [url])
+    if url in cached:
+        return cached[url]
+    response = await execute_request(url)
+    await asyncio.to_thread(_store, {url: response}, ttl)
+    return response
+
+
+async def cached_execute_multiple_requests(
+    urls: Dict[str, str], ttl: Optional[float] = None
+) -> Dict[str, Any]:
+    """execute_multiple_requests, fetching only the URLs missing from the cache."""
+    if not GBIF_CACHE_PATH:
+        return await execute_multiple_requests(urls)
+
+    # One worker-thread hop for all lookups and one for all stores
+    cached = await asyncio.to_thread(_lookup, set(urls.values()))
+    missing = {name: url for name, url in urls.items() if url not in cached}
+    if not missing:
+        return {name: cached[url] for name, url in urls.items()}
+
+    fetched = await execute_multiple_requests(missing)
+    successes = {
+        missing[name]: response
+        for name, response in fetched.items()
+        if "error" not in response
+    }
+    if successes:
+        await asyncio.to_thread(_store, successes, ttl)
+    return {
+        name: fetched[name] if name in fetched else cached[url]
+        for name, url in urls.items()
+    }
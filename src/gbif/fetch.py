@@ -1,64 +1,165 @@
 import asyncio
-import requests
-from typing import Dict, Any
+import json
+import os
+import random
+import httpx
+from typing import AsyncIterator, Dict, Any, Optional, Tuple
 
 from src.log import logger
 from ichatbio.agent_response import IChatBioAgentProcess
 
 
-def execute_sync_request(url: str, max_retries: int = 3) -> Dict[str, Any]:
-    """Execute a sync request with retry logic for 500 status codes."""
-    for attempt in range(max_retries + 1):
+# Maximum GBIF requests in flight per event loop across all fan-outs
+GBIF_MAX_CONCURRENCY = int(os.getenv("GBIF_MAX_CONCURRENCY", "16"))
+
+# Optional upper bound in seconds on one request in a fan-out, retries
+# included; unset or 0 leaves requests to their own timeout and retries
+GBIF_FANOUT_TIMEOUT = float(os.getenv("GBIF_FANOUT_TIMEOUT", "0")) or None
+
+# Async client and concurrency limit shared by execute_request. Both belong to
+# the event loop they were first used on, so they are recreated per loop.
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+_REQUEST_SEMAPHORE: Optional[asyncio.Semaphore] = None
+_ASYNC_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_ASYNC_CLOSER: Optional[AsyncIterator[None]] = None
+
+
+def _create_async_client() -> httpx.AsyncClient:
+    # Requests only go out under the semaphore, so the pool never needs
+    # more connections than GBIF_MAX_CONCURRENCY; keep them all alive
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=GBIF_MAX_CONCURRENCY,
+            max_keepalive_connections=GBIF_MAX_CONCURRENCY,
+        ),
+        timeout=30,
+    )
+
+
+async def _close_on_loop_shutdown(client: httpx.AsyncClient) -> AsyncIterator[None]:
+    """
+    Close client when the loop that owns it finalizes its async generators.
+
+    asyncio.run() does that before closing the loop, so the client's
+    connections are closed on their own loop. If the generator is dropped
+    first (a later loop replaced the client), the loop's finalizer hook
+    closes the client the same way.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+async def _get_async_client() -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    """Return the shared client and request semaphore for the running loop."""
+    global _ASYNC_CLIENT, _REQUEST_SEMAPHORE, _ASYNC_LOOP, _ASYNC_CLOSER
+
+    loop = asyncio.get_running_loop()
+    if _ASYNC_CLIENT is None or _ASYNC_LOOP is not loop:
+        client = _create_async_client()
+        closer = _close_on_loop_shutdown(client)
+        await closer.__anext__()
+        _ASYNC_CLIENT = client
+        _REQUEST_SEMAPHORE = asyncio.Semaphore(GBIF_MAX_CONCURRENCY)
+        _ASYNC_LOOP = loop
+        _ASYNC_CLOSER = closer
+    return _ASYNC_CLIENT, _REQUEST_SEMAPHORE
+
+
+def _decode_json(content: bytes) -> Any:
+    """Decode a JSON body from bytes, skipping text decoding and charset sniffing."""
+    return json.loads(content)
+
+
+def _with_status_code(result: Any, status_code: int) -> Dict[str, Any]:
+    """Attach the status code, wrapping list responses as {"data": [...]}."""
+    if isinstance(result, dict):
+        result["status_code"] = status_code
+        return result
+    return {"data": result, "status_code": status_code}
+
+
+# Server errors that retrying will not fix
+_NON_TRANSIENT_STATUS = frozenset({501, 505})
+
+# Upper bound on the exponential part of the retry delay, in seconds
+_MAX_BACKOFF = 8
+
+
+def _should_retry(status_code: int, attempt: int, max_retries: int) -> bool:
+    return (
+        status_code >= 500
+        and status_code not in _NON_TRANSIENT_STATUS
+        and attempt < max_retries
+    )
+
+
+def _retry_delay(headers, attempt: int) -> float:
+    """Seconds to wait before the next attempt, honoring Retry-After if given."""
+    retry_after = headers.get("Retry-After")
+    if retry_after:
         try:
-            response = requests.get(url, timeout=30)
-
-            if response.status_code >= 500:
-                if attempt < max_retries:
-                    logger.warning(
-                        f"Got {response.status_code} status, retrying (attempt {attempt + 1}/{max_retries})"
-                    )
-                    continue
-                else:
-                    response.raise_for_status()
-
-            response.raise_for_status()
-            result = response.json()
-            # Handle both dict and list responses
-            if isinstance(result, dict):
-                result["status_code"] = response.status_code
-                return result
-            else:
-                return {"data": result, "status_code": response.status_code}
-
-        except requests.exceptions.HTTPError as e:
-            if attempt == max_retries or (e.response and e.response.status_code < 500):
-                raise
+            return max(0.0, float(retry_after))
+        except ValueError:
+            # HTTP-date form; fall back to backoff
+            pass
+    # Jitter keeps concurrent failing requests from retrying in lockstep
+    return min(_MAX_BACKOFF, 0.25 * 2**attempt) + random.random() * 0.1
+
+
+async def execute_request(url: str, max_retries: int = 3) -> Dict[str, Any]:
+    """Execute an async request with backoff retries for transient 5xx responses."""
+    client, semaphore = await _get_async_client()
+    for attempt in range(max_retries + 1):
+        async with semaphore:
+            response = await client.get(url)
+
+        if _should_retry(response.status_code, attempt, max_retries):
+            # Sleep outside the semaphore so waiting retries free their slot
+            delay = _retry_delay(response.headers, attempt)
             logger.warning(
-                f"Request failed: {e}, retrying (attempt {attempt + 1}/{max_retries})"
+                f"Got {response.status_code} status, retrying in {delay:.2f}s "
+                f"(attempt {attempt + 1}/{max_retries})"
             )
+            await asyncio.sleep(delay)
+            continue
 
-    raise RuntimeError("Max retries exceeded")
+        response.raise_for_status()
+        # Handle both dict and list responses
+        return _with_status_code(
+            _decode_json(response.content), response.status_code
+        )
 
+    raise RuntimeError("Max retries exceeded")
 
-async def execute_request(url: str) -> Dict[str, Any]:
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, execute_sync_request, url)
 
 async def execute_multiple_requests(urls: Dict[str, str]) -> Dict[str, Any]:
-    tasks = []
-    for endpoint_name, url in urls.items():
-        tasks.append(execute_request(url))
+    """
+    Fetch several URLs concurrently; at most GBIF_MAX_CONCURRENCY are in flight.
+
+    Endpoints that share a URL share a single request and its result. If
+    GBIF_FANOUT_TIMEOUT is set, it bounds each request so one slow endpoint
+    cannot hold up the others. Failures are reported as {"error": ...} results.
+    """
 
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    async def fetch(url: str) -> Dict[str, Any]:
+        try:
+            async with asyncio.timeout(GBIF_FANOUT_TIMEOUT):
+                return await execute_request(url)
+        except TimeoutError:
+            return {"error": f"Request timed out after {GBIF_FANOUT_TIMEOUT:g}s"}
+        except Exception as e:
+            return {"error": str(e)}
 
-    combined_results = {}
-    for endpoint_name, result in zip(urls.keys(), results):
-        if isinstance(result, Exception):
-            combined_results[endpoint_name] = {"error": str(result)}
-        else:
-            combined_results[endpoint_name] = result
+    unique_urls = dict.fromkeys(urls.values())
+    async with asyncio.TaskGroup() as tg:
+        tasks = {url: tg.create_task(fetch(url)) for url in unique_urls}
+
+    return {
+        endpoint_name: tasks[url].result() for endpoint_name, url in urls.items()
+    }
 
-    return combined_results
 
 async def fetch_gbif_data(url: str, timeout: int = 30) -> Dict[str, Any]:
     return await execute_request(url)
@@ -69,97 +170,81 @@ async def execute_paginated_request(
 ) -> Dict[str, Any]:
     """
     Execute multiple paginated requests to fetch up to total_limit records.
-    Fetches 5 pages concurrently at a time for better performance.
+    Fetches the first page to learn the record count, then requests all
+    remaining pages concurrently (bounded by GBIF_MAX_CONCURRENCY).
 
     Returns:
         Combined response dictionary with all results and updated metadata
     """
     batch_size = 300
-    pages_per_batch = 5
     initial_offset = search_params.offset or 0
-    offset = initial_offset
-    all_results = []
-    first_response_metadata = None
-
-    while len(all_results) < total_limit:
-        page_requests = []
-        current_offset = offset
-
-        for _ in range(pages_per_batch):
-            remaining = total_limit - len(all_results) - len(page_requests) * batch_size
-            if remaining <= 0:
-                break
-
-            this_limit = min(batch_size, remaining)
-            paginated_params = search_params.model_copy(
-                update={"limit": this_limit, "offset": current_offset}
-            )
-            request_url = api.build_occurrence_search_url(paginated_params)
-            page_requests.append((request_url, current_offset))
-            current_offset += this_limit
 
-        if not page_requests:
-            break
+    # Only limit/offset change between pages; encode everything else once
+    url_template = api.build_occurrence_search_url_template(search_params)
 
-        await process.log(
-            f"Fetching {len(page_requests)} pages starting at offset {offset}"
-        )
-        try:
+    def page_url(page_offset: int, page_limit: int) -> str:
+        return f"{url_template}limit={page_limit}&offset={page_offset}"
+
+    first_limit = min(batch_size, total_limit)
+    await process.log(f"Fetching first page at offset {initial_offset}")
+    first_response = await execute_request(page_url(initial_offset, first_limit))
+
+    first_response_metadata = {
+        "count": first_response.get("count", 0),
+        "endOfRecords": first_response.get("endOfRecords", False),
+        "status_code": first_response.get("status_code", 200),
+    }
+    all_results = list(first_response.get("results", []))
+
+    more_pages = (
+        all_results
+        and len(all_results) == first_limit
+        and not first_response.get("endOfRecords", False)
+    )
+    if more_pages:
+        # Never ask for more than requested or than GBIF reports to exist
+        end_offset = initial_offset + total_limit
+        if first_response_metadata["count"]:
+            end_offset = min(end_offset, first_response_metadata["count"])
+
+        remaining_offsets = range(initial_offset + first_limit, end_offset, batch_size)
+        pages = [
+            (page_offset, min(batch_size, end_offset - page_offset))
+            for page_offset in remaining_offsets
+        ]
+        if pages:
+            await process.log(
+                f"Fetching {len(pages)} pages starting at offset {pages[0][0]}"
+            )
             responses = await asyncio.gather(
-                *[execute_request(url) for url, _ in page_requests],
+                *[execute_request(page_url(o, limit)) for o, limit in pages],
                 return_exceptions=True,
             )
-        except Exception as e:
-            if all_results:
-                break
-            raise e
-
-        end_of_records = False
-        for i, response in enumerate(responses):
-            if isinstance(response, Exception):
-                if all_results:
-                    end_of_records = True
-                    break
-                raise response
-
-            if first_response_metadata is None:
-                first_response_metadata = {
-                    "count": response.get("count", 0),
-                    "endOfRecords": response.get("endOfRecords", False),
-                    "status_code": response.get("status_code", 200),
-                }
 
-            batch_results = response.get("results", [])
-            if not batch_results:
-                end_of_records = True
-                break
-
-            all_results.extend(batch_results)
+            # Keep pages in order up to the first failed, empty or short page
+            for (_, page_limit), response in zip(pages, responses):
+                if isinstance(response, Exception):
+                    break
 
-            if response.get("endOfRecords", False) or len(batch_results) < batch_size:
-                end_of_records = True
-                break
+                batch_results = response.get("results", [])
+                if not batch_results:
+                    break
 
-            offset = page_requests[i][1] + len(batch_results)
+                all_results.extend(batch_results)
 
-        if end_of_records:
-            break
+                if (
+                    response.get("endOfRecords", False)
+                    or len(batch_results) < page_limit
+                ):
+                    break
 
     combined_response = {
         "offset": initial_offset,
         "limit": total_limit,
         "endOfRecords": len(all_results) < total_limit,
-        "count": (
-            first_response_metadata.get("count", len(all_results))
-            if first_response_metadata
-            else len(all_results)
-        ),
+        "count": first_response_metadata["count"] or len(all_results),
         "results": all_results,
-        "status_code": (
-            first_response_metadata.get("status_code", 200)
-            if first_response_metadata
-            else 200
-        ),
+        "status_code": first_response_metadata["status_code"],
         "facets": [],
     }
 
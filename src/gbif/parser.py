@@ -1,25 +1,58 @@
+import asyncio
+import copy
 import datetime
+import functools
+import hashlib
 import json
+import os
+import time
+from collections import OrderedDict
 
-from pydantic import BaseModel, Field, create_model
+from pydantic import BaseModel, Field, TypeAdapter, create_model
+from pydantic_core import to_json
 from instructor.exceptions import InstructorRetryException
-from tenacity import retry, stop_after_attempt, wait_exponential
-from typing import Type, Optional
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential
+from typing import List, Optional, Sequence, Tuple, Type, Union
 
-from dotenv import load_dotenv
 from src.utils import UserRequestExpansion, IdentifiedOrganism
-from src.models.location import ResolvedLocation, GadmMatchType
+from src.models.location import Location, ResolvedLocation, GadmMatchType
 from src.instructor_client import get_client
+from src.log import logger
 
-load_dotenv()
+# Maximum LLM parse calls in flight for one parse_many batch
+GBIF_LLM_MAX_CONCURRENCY = int(os.getenv("GBIF_LLM_MAX_CONCURRENCY", "20"))
 
 
-CURRENT_DATE = datetime.datetime.now().strftime("%B %d, %Y")
+# Parse results by prompt, most recently used last. The prompt includes today's
+# date and the preprocessing output, so only identical requests share a result.
+# Off by default; set GBIF_PARSE_CACHE_SIZE to the number of results to keep.
+PARSE_CACHE_SIZE = int(os.getenv("GBIF_PARSE_CACHE_SIZE", "0"))
+PARSE_CACHE_TTL = 30 * 60
+_PARSE_CACHE: "OrderedDict[Tuple[str, type, bytes], Tuple[float, BaseModel]]" = (
+    OrderedDict()
+)
 
 
+def current_date() -> str:
+    """Today's date for the prompt; evaluated per request, not at import."""
+    return datetime.datetime.now().strftime("%B %d, %Y")
+
+
+# Shared base for every response model; no docstring, so the schema sent to
+# the LLM is unchanged
+class _LLMResponseValidation(BaseModel):
+    def model_post_init(self, __context):
+        if not self.clarification_needed and self.artifact_description is None:
+            raise ValueError(
+                "artifact_description must not be None if clarification_needed is False."
+            )
+
+
+@functools.lru_cache(maxsize=None)
 def create_response_model(parameter_model: Type[BaseModel]) -> Type[BaseModel]:
-    DynamicModel = create_model(
-        "LLMResponse",
+    """Build the LLM response model once per parameter model class."""
+    return create_model(
+        "LLMResponseWithValidation",
         plan=(
             str,
             Field(
@@ -64,41 +97,41 @@ def create_response_model(parameter_model: Type[BaseModel]) -> Type[BaseModel]:
                 default=None,
             ),
         ),
-        __base__=BaseModel,
+        __base__=_LLMResponseValidation,
     )
 
-    class LLMResponseWithValidation(DynamicModel):
-        def model_post_init(self, __context):
-            if not self.clarification_needed and self.artifact_description is None:
-                raise ValueError(
-                    "artifact_description must not be None if clarification_needed is False."
-                )
-
-    return LLMResponseWithValidation
-
 
-def get_system_prompt(entrypoint_id: str):
-    prompt = ""
+@functools.lru_cache(maxsize=None)
+def _load_base_prompt() -> str:
     with open("src/resources/prompts/parse_api_parameters.md", "r") as f:
-        prompt += f.read()
+        return f.read()
 
-    examples = []
+
+@functools.lru_cache(maxsize=None)
+def _load_fewshot() -> dict:
     with open("src/resources/fewshot.json", "r") as f:
-        fewshot = json.load(f)
-        if entrypoint_id in fewshot.keys():
-            for idx, example in enumerate(fewshot[entrypoint_id]):
-                e = f"""
-                ### Example {idx + 1}:
-                ```json
-                {json.dumps(example, indent=2)}
-                ```
-                """
-                examples.append(e)
+        return json.load(f)
+
 
+@functools.lru_cache(maxsize=None)
+def get_system_prompt(entrypoint_id: str) -> str:
+    """Build the system prompt with fewshot examples, once per entrypoint."""
+    parts = [_load_base_prompt()]
+
+    examples = _load_fewshot().get(entrypoint_id, [])
     if examples:
-        prompt += "\n\n## Examples: \n\n" + "\n".join(examples)
+        parts.append("\n\n## Examples: \n\n")
+        for idx, example in enumerate(examples):
+            parts.append(
+                f"### Example {idx + 1}:\n"
+                f"```json\n{to_json(example, indent=2).decode()}\n```\n\n"
+            )
 
-    return prompt
+    return "".join(parts)
+
+
+# Serializes organism lists straight to JSON without an intermediate dict pass
+_ORGANISMS_ADAPTER = TypeAdapter(list[IdentifiedOrganism])
 
 
 def format_organisms_parsing_response(
@@ -107,58 +140,62 @@ def format_organisms_parsing_response(
     message = f"""
     ```json
     Organisms identified in the user request: {
-        json.dumps([
-            organism.model_dump(exclude_none=True, mode="json") 
-            for organism in organisms
-        ], indent=2)
+        _ORGANISMS_ADAPTER.dump_json(organisms, exclude_none=True, indent=2).decode()
     }
     ```
     """
     return message
 
 
+_RESOLUTION_STATUS = {
+    GadmMatchType.COMPLETE: "successfully resolved to gadm",
+    GadmMatchType.PARTIAL: "partially resolved to gadm",
+}
+
+
+class _LocationDisplay(ResolvedLocation):
+    """A location as shown to the LLM, with its GADM resolution status."""
+
+    resolution_status: str
+
+
+_LOCATIONS_ADAPTER = TypeAdapter(list[_LocationDisplay])
+
+
+def _display_location(location: Location) -> _LocationDisplay:
+    # Look up the enum itself; the JSON dump only holds its string value
+    status_msg = _RESOLUTION_STATUS.get(
+        getattr(location, "match_type", None), "not resolved to gadm"
+    )
+    # Plain Locations carry no match fields; None keeps them out of the dump
+    return _LocationDisplay.model_construct(
+        **{"match_type": None, **location.__dict__, "query_trace": None},
+        resolution_status=status_msg,
+    )
+
+
 def format_locations_parsing_response(
     locations: list[ResolvedLocation],
 ):
-    display_locations = []
-    overall_statuses = []
-
-    for location in locations:
-        loc_dict = location.model_dump(exclude_none=True, mode="json")
-        match_type = loc_dict.get("match_type")
-        loc_dict.pop("query_trace", None)
-        if match_type == GadmMatchType.COMPLETE:
-            status_msg = "successfully resolved to gadm"
-        elif match_type == GadmMatchType.PARTIAL:
-            status_msg = "partially resolved to gadm"
-        else:
-            status_msg = "not resolved to gadm"
-        loc_dict["resolution_status"] = status_msg
-        overall_statuses.append(status_msg)
-        display_locations.append(loc_dict)
+    display_locations = [_display_location(location) for location in locations]
 
     message = f"""
     ```json
     Locations identified in the user request: {
-        json.dumps(display_locations, indent=2)
+        _LOCATIONS_ADAPTER.dump_json(
+            display_locations, exclude_none=True, indent=2
+        ).decode()
     }
     ```
     """
     return message
 
 
-# For validation errors - shorter delays
-@retry(wait=wait_exponential(multiplier=1, min=1, max=10), stop=stop_after_attempt(3))
-async def parse(
+def _build_messages(
     request: str,
     entrypoint_id: str,
-    parameters_model: Type[BaseModel],
     preprocess_information: Optional[UserRequestExpansion] = None,
-) -> Type[BaseModel]:
-    response_model = create_response_model(parameters_model)
-
-    client = await get_client()
-
+) -> list[dict]:
     messages = [
         {
             "role": "system",
@@ -194,24 +231,106 @@ async def parse(
     messages.append(
         {
             "role": "user",
-            "content": f"Today's date is {CURRENT_DATE}. Generate GBIF Request Parameters for the following user request: {request}",
+            "content": f"Today's date is {current_date()}. Generate GBIF Request Parameters for the following user request: {request}",
         }
     )
+    return messages
+
+
+async def _request_parameters(
+    request: str,
+    messages: list[dict],
+    response_model: Type[BaseModel],
+) -> Type[BaseModel]:
+    client = await get_client()
 
     instructor_validation_context = {"user_request": request}
 
-    try:
-        response = await client.chat.completions.create(
-            messages=messages,
-            response_model=response_model,
-            context=instructor_validation_context,
-            max_retries=3,
-        )
-    except InstructorRetryException as e:
-        # Access failed attempts for debugging
-        print(f"Failed after {e.n_attempts} attempts")
-        print(f"Exception details: {e}")
-    except Exception as e:
-        print(f"Exception details: {e}")
-
-    return response
+    # For validation errors - shorter delays. AsyncRetrying waits with
+    # asyncio.sleep, so a backoff never blocks other requests on the loop.
+    retrying = AsyncRetrying(
+        wait=wait_exponential(multiplier=1, min=1, max=10),
+        stop=stop_after_attempt(3),
+        reraise=True,
+    )
+    async for attempt in retrying:
+        with attempt:
+            try:
+                return await client.chat.completions.create(
+                    messages=messages,
+                    response_model=response_model,
+                    context=instructor_validation_context,
+                    max_retries=3,
+                )
+            except InstructorRetryException as e:
+                # Access failed attempts for debugging
+                logger.warning(f"Failed after {e.n_attempts} attempts: {e}")
+                raise
+            except Exception as e:
+                logger.warning(f"Exception details: {e}")
+                raise
+
+
+def clear_parse_cache() -> None:
+    """Drop every cached parse result."""
+    _PARSE_CACHE.clear()
+
+
+async def parse(
+    request: str,
+    entrypoint_id: str,
+    parameters_model: Type[BaseModel],
+    preprocess_information: Optional[UserRequestExpansion] = None,
+) -> Type[BaseModel]:
+    # Messages are built once; only the LLM call is retried
+    response_model = create_response_model(parameters_model)
+    messages = _build_messages(request, entrypoint_id, preprocess_information)
+
+    if PARSE_CACHE_SIZE <= 0:
+        return await _request_parameters(request, messages, response_model)
+
+    key = (entrypoint_id, parameters_model, hashlib.sha256(to_json(messages)).digest())
+    cached = _PARSE_CACHE.get(key)
+    if cached is not None:
+        expires_at, result = cached
+        if expires_at > time.monotonic():
+            _PARSE_CACHE.move_to_end(key)
+            # Deep copies, so callers never share nested parameter objects
+            return copy.deepcopy(result)
+        del _PARSE_CACHE[key]
+
+    result = await _request_parameters(request, messages, response_model)
+    _PARSE_CACHE[key] = (time.monotonic() + PARSE_CACHE_TTL, copy.deepcopy(result))
+    while len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+        _PARSE_CACHE.popitem(last=False)
+    return result
+
+
+async def parse_many(
+    requests: Sequence[str],
+    entrypoint_id: str,
+    parameters_model: Type[BaseModel],
+    preprocess_information: Optional[Sequence[Optional[UserRequestExpansion]]] = None,
+) -> List[Union[BaseModel, Exception]]:
+    """
+    Parse several requests concurrently, in input order.
+
+    At most GBIF_LLM_MAX_CONCURRENCY LLM calls are in flight. A request that
+    fails to parse is returned as its exception, so one failure does not
+    discard the rest of the batch.
+    """
+    if preprocess_information is None:
+        preprocess_information = [None] * len(requests)
+    semaphore = asyncio.Semaphore(GBIF_LLM_MAX_CONCURRENCY)
+
+    async def parse_one(request, information):
+        async with semaphore:
+            return await parse(request, entrypoint_id, parameters_model, information)
+
+    return await asyncio.gather(
+        *[
+            parse_one(request, information)
+            for request, information in zip(requests, preprocess_information)
+        ],
+        return_exceptions=True,
+    )
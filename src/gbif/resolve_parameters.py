@@ -1,5 +1,8 @@
+import asyncio
+from functools import lru_cache
+
 from src.gbif.api import GbifApi
-from src.gbif.fetch import execute_request, execute_multiple_requests
+from src.gbif.cache import cached_execute_request, cached_execute_multiple_requests
 from ichatbio.agent_response import IChatBioAgentProcess
 
 from src.utils import IdentifiedOrganism
@@ -11,14 +14,52 @@ Module for resolving taxonomic names to GBIF keys automatically.
 """
 
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Tuple, Any
+from pydantic import BaseModel, Field, create_model
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Type, Any
 from src.gbif.api import GbifApi
 from src.gbif.fetch import execute_request
 from ichatbio.agent_response import IChatBioAgentProcess
 
 load_dotenv()
 
+# Species match lookups in flight, so concurrent resolutions of one name share
+# a request. Tasks belong to the loop that created them, so the table is
+# replaced when the running loop changes. Responses are cached by
+# cached_execute_request when the on-disk GBIF cache is enabled.
+_SPECIES_MATCH_PENDING: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+_SPECIES_MATCH_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+# Names behind a backbone key change only with backbone releases
+SPECIES_KEY_CACHE_TTL = 7 * 24 * 60 * 60
+
+
+def _pending_species_matches() -> Dict[str, "asyncio.Task[Dict[str, Any]]"]:
+    """Return the in-flight species match lookups for the running loop."""
+    global _SPECIES_MATCH_PENDING, _SPECIES_MATCH_LOOP
+
+    loop = asyncio.get_running_loop()
+    if _SPECIES_MATCH_LOOP is not loop:
+        _SPECIES_MATCH_PENDING = {}
+        _SPECIES_MATCH_LOOP = loop
+    return _SPECIES_MATCH_PENDING
+
+
+async def _fetch_species_match(url: str) -> Dict[str, Any]:
+    """
+    cached_execute_request for species match URLs, shared by concurrent callers.
+
+    A lookup is only shared while it is in flight. The returned dict is
+    shared between those callers and must not be modified.
+    """
+    pending = _pending_species_matches()
+    task = pending.get(url)
+    if task is None:
+        task = asyncio.ensure_future(cached_execute_request(url))
+        task.add_done_callback(lambda _: pending.pop(url, None))
+        pending[url] = task
+    # Shielded so one cancelled caller does not cancel the shared request
+    return await asyncio.shield(task)
+
 
 class TaxonomicExtraction(BaseModel):
     """Model for LLM-based taxonomic name extraction."""
@@ -70,6 +111,17 @@ Examples:
 - "butterflies from family Nymphalidae" → families: ["Nymphalidae"]"""
 
 
+# TaxonomicExtraction field holding the names for each rank
+extraction_fields = {
+    "family": "families",
+    "genus": "genera",
+    "species": "species",
+    "order": "orders",
+    "class": "classes",
+    "phylum": "phylums",
+    "kingdom": "kingdoms",
+}
+
 resolvable_fields = {
     "familyKey": "family",
     "genusKey": "genus",
@@ -82,29 +134,38 @@ resolvable_fields = {
 }
 
 
+def _name_key(name: Optional[str]) -> str:
+    """Normalize a taxon name or rank for duplicate detection."""
+    return " ".join((name or "").split()).casefold()
+
+
 async def resolve_field_from_request(
-    api: GbifApi, process: IChatBioAgentProcess, field_name: str, user_request: str
+    api: GbifApi,
+    process: IChatBioAgentProcess,
+    field_name: str,
+    extraction: TaxonomicExtraction,
+    artifact_urls: Optional[Set[str]] = None,
 ) -> Optional[List[int]]:
     if field_name not in resolvable_fields:
         return None
     rank = resolvable_fields[field_name]
-    extraction = await extract_taxonomic_names(process, user_request)
-    rank_mapping = {
-        "family": extraction.families,
-        "genus": extraction.genera,
-        "species": extraction.species,
-        "order": extraction.orders,
-        "class": extraction.classes,
-        "phylum": extraction.phylums,
-        "kingdom": extraction.kingdoms,
-    }
-    names = rank_mapping.get(rank, [])
+    # The same name may be extracted twice, differing only in case or spacing
+    unique_names = {}
+    for name in getattr(extraction, extraction_fields[rank]):
+        unique_names.setdefault(_name_key(name), name)
+    names = list(unique_names.values())
     if not names:
         return None
 
+    keys = await asyncio.gather(
+        *[
+            resolve_name_to_key(api, process, name, rank, artifact_urls)
+            for name in names
+        ]
+    )
+
     resolved_keys = []
-    for name in names:
-        key = await resolve_name_to_key(api, process, name, rank)
+    for name, key in zip(names, keys):
         if key:
             resolved_keys.append(key)
             await process.log(f"Resolved {rank} '{name}' to {key}")
@@ -113,10 +174,37 @@ async def resolve_field_from_request(
     return resolved_keys if resolved_keys else None
 
 
+@lru_cache
+def _extraction_model(ranks: Tuple[str, ...]) -> Type[BaseModel]:
+    """TaxonomicExtraction narrowed to the given ranks and the note."""
+    fields = [extraction_fields[rank] for rank in ranks] + ["note"]
+    return create_model(
+        "TaxonomicExtraction",
+        __doc__=TaxonomicExtraction.__doc__,
+        **{
+            field: (info.annotation, info)
+            for field, info in TaxonomicExtraction.model_fields.items()
+            if field in fields
+        },
+    )
+
+
 async def extract_taxonomic_names(
-    process: IChatBioAgentProcess, user_request: str
+    process: IChatBioAgentProcess,
+    user_request: str,
+    ranks: Optional[Iterable[str]] = None,
 ) -> TaxonomicExtraction:
+    """
+    Extract taxonomic names from the request with the LLM.
+
+    If ranks is given, the model is only asked for names at those ranks,
+    which keeps the response short; the other ranks come back empty.
+    """
     await process.log("Diving deeper...")
+    if ranks is None:
+        response_model = TaxonomicExtraction
+    else:
+        response_model = _extraction_model(tuple(sorted(set(ranks))))
     try:
         openai_client = await get_client()
         messages = [
@@ -128,10 +216,10 @@ async def extract_taxonomic_names(
         ]
         response = await openai_client.chat.completions.create(
             messages=messages,
-            response_model=TaxonomicExtraction,
+            response_model=response_model,
         )
         await process.log(f"Taxonomic names extracted", data=response.model_dump())
-        return response
+        return TaxonomicExtraction.model_construct(**response.model_dump())
     except Exception as e:
         await process.log(
             f"LLM extraction failed, falling back to empty extraction: {str(e)}"
@@ -139,27 +227,46 @@ async def extract_taxonomic_names(
         return TaxonomicExtraction()
 
 
+async def _create_species_match_artifact(
+    process: IChatBioAgentProcess,
+    name: str,
+    url: str,
+    artifact_urls: Optional[Set[str]],
+) -> None:
+    """Record a species match call, once per URL within artifact_urls' scope."""
+    if artifact_urls is not None:
+        if url in artifact_urls:
+            return
+        artifact_urls.add(url)
+    await process.create_artifact(
+        mimetype="application/json",
+        description=f"GBIF Species Match API call results for: {name}",
+        uris=[url],
+        metadata={
+            "data_source": "GBIF Species Match",
+        },
+    )
+
+
 async def resolve_name_to_key(
-    api: GbifApi, process: IChatBioAgentProcess, name: str, expected_rank: str
+    api: GbifApi,
+    process: IChatBioAgentProcess,
+    name: str,
+    expected_rank: str,
+    artifact_urls: Optional[Set[str]] = None,
 ) -> Optional[int]:
     try:
         params = GBIFSpeciesNameMatchParams(scientificName=name)
         url = api.build_species_match_url(params)
         await process.log(f"Attempting to resolve {expected_rank} names: {name}", data={'url': url})
-        result = await execute_request(url)
-        await process.create_artifact(
-            mimetype="application/json",
-            description=f"GBIF Species Match API call results for: {name}",
-            uris=[url],
-            metadata={
-                "data_source": "GBIF Species Match",
-            },
-        )
-        if result.get("usage") and result.get("usage", {}).get("key"):
-            usage = result["usage"]
-            key = usage.get("key")
+        result = await _fetch_species_match(url)
+        usage = result.get("usage")
+        if usage and usage.get("key"):
+            # Only record the call as an artifact when GBIF found a match
+            await _create_species_match_artifact(process, name, url, artifact_urls)
+            key = usage["key"]
             rank = usage.get("rank", "").lower()
-            if rank == expected_rank.upper() or rank == expected_rank.lower():
+            if rank == expected_rank.lower():
                 return key
             else:
                 await process.log(
@@ -193,10 +300,28 @@ async def resolve_pending_search_parameters(
     resolved = {}
     unresolved = []
 
-    for field in unresolved_params:
-        resolved_keys = await resolve_field_from_request(
-            api, process, field, user_request
-        )
+    # One extraction covers every field, so only ask the LLM once per request
+    ranks = {
+        resolvable_fields[field]
+        for field in unresolved_params
+        if field in resolvable_fields
+    }
+    if ranks:
+        extraction = await extract_taxonomic_names(process, user_request, ranks)
+    else:
+        extraction = TaxonomicExtraction()
+
+    # Fields resolve independently, so resolve them concurrently. Names shared
+    # between fields hit the same match URL; record it as one artifact.
+    artifact_urls = set()
+    results = await asyncio.gather(
+        *[
+            resolve_field_from_request(api, process, field, extraction, artifact_urls)
+            for field in unresolved_params
+        ]
+    )
+
+    for field, resolved_keys in zip(unresolved_params, results):
         if resolved_keys:
             resolved[field] = resolved_keys
         else:
@@ -206,162 +331,189 @@ async def resolve_pending_search_parameters(
     return resolved, unresolved
 
 
-async def resolve_names_to_taxonkeys(
-    api: GbifApi, organisms: List[IdentifiedOrganism], process: IChatBioAgentProcess
-) -> list:
-    """
-    Resolve scientific names to GBIF taxon keys using the species match API.
-
-    Note:
-        This function uses the GBIF /v2/species/match endpoint for fuzzy name matching.
-        Only successfully resolved names will have their taxon keys included in the result.
-        Each API call generates an artifact for tracking purposes.
-    """
-    if not organisms:
-        return []
+# Map rank names to GBIFSpeciesNameMatchParams parameter names
+rank_param_map = {
+    "family": "family",
+    "genus": "genus",
+    "species": "scientificName",
+    "order": "order",
+    "class": "taxonomic_class",
+    "phylum": "phylum",
+    "kingdom": "kingdom",
+}
 
-    taxon_keys = []
 
-    for organism in organisms:
-        data = organism.model_dump(exclude_none=True, mode="json")
-        await process.log(f"Resolving organism", data=data)
+async def _resolve_organism_to_taxon_key(
+    api: GbifApi,
+    organism: IdentifiedOrganism,
+    process: IChatBioAgentProcess,
+    artifact_urls: Optional[Set[str]] = None,
+) -> Optional[int]:
+    """Resolve one organism to a taxon key via rank, name, then alternatives."""
+    # The fields are all JSON-native, so the python-mode dump is already
+    # JSON-safe and skips pydantic's JSON conversion pass
+    data = organism.model_dump(exclude_none=True)
+    await process.log(f"Resolving organism", data=data)
+    result = None
+    url = None
+    name = organism.scientific_name
+    rank = organism.taxonomic_rank
+    if not name:
+        await process.log(f"No scientific name found for organism: {data}")
+        return None
+    try:
+        params_dict = {}
+        rank_field = rank_param_map.get(rank)
         result = None
         url = None
-        name = data.get("scientific_name", None)
-        rank = data.get("taxonomic_rank", None)
-        if not name:
-            await process.log(f"No scientific name found for organism: {data}")
-            continue
-        try:
-            # Map rank names to GBIFSpeciesNameMatchParams parameter names
-            rank_param_map = {
-                "family": "family",
-                "genus": "genus",
-                "species": "scientificName",
-                "order": "order",
-                "class": "taxonomic_class",
-                "phylum": "phylum",
-                "kingdom": "kingdom",
-            }
-            params_dict = {}
-            rank_field = (
-                rank_param_map.get(rank.lower()) if isinstance(rank, str) else None
+
+        # Try with rank-specific parameter if available
+        if rank_field:
+            params_dict[rank_field] = name
+            params = GBIFSpeciesNameMatchParams(**params_dict)
+            url = api.build_species_match_url(params)
+            await process.log(
+                f"Attempting to resolve {name} with rank {rank_field}",
+                data={"url": url},
             )
-            result = None
-            url = None
-
-            # Try with rank-specific parameter if available
-            if rank_field:
-                params_dict[rank_field] = name
-                params = GBIFSpeciesNameMatchParams(**params_dict)
-                url = api.build_species_match_url(params)
-                await process.log(
-                    f"Attempting to resolve {name} with rank {rank_field}",
-                    data={"url": url},
-                )
-                result = await execute_request(url)
-
-            # If no match found with rank-specific parameter, try with scientificName
-            if not result or not (
-                result.get("usage") and result.get("usage", {}).get("key")
-            ):
-                params = GBIFSpeciesNameMatchParams(scientificName=name)
-                url = api.build_species_match_url(params)
-                await process.log(
-                    f"Could not resolve to taxon key for {name} with rank {rank_field}, attempting to resolve with scientificName",
-                    data={"url": url},
-                )
-                result = await execute_request(url)
-
-            # If still no match, try with verbose=True to get alternatives
-            if not result or not (
-                result.get("usage") and result.get("usage", {}).get("key")
-            ):
-                params = GBIFSpeciesNameMatchParams(scientificName=name, verbose=True)
-                url = api.build_species_match_url(params)
-                await process.log(
-                    f"Could not resolve to taxon key for '{name}', trying alternate names with `verbose=true`",
-                    data={"url": url},
-                )
-                data = await execute_request(url)
-                alternatives = data.get("diagnostics", {}).get("alternatives", [])
-                if alternatives:
-                    # Format alternatives list
-                    first_5 = alternatives[:5]
-                    alternatives_text = f"Found {len(alternatives)} alternatives. Here are the first {len(first_5)}:\n\n"
-
-                    for alt in first_5:
-                        usage = alt.get("usage", {})
-                        rank = usage.get("rank", "Unknown")
-                        scientific_name = usage.get(
-                            "name", usage.get("scientificName", "Unknown")
-                        )
+            result = await _fetch_species_match(url)
+
+        # If no match found with rank-specific parameter, try with scientificName
+        if not result or not (
+            result.get("usage") and result.get("usage", {}).get("key")
+        ):
+            params = GBIFSpeciesNameMatchParams(scientificName=name)
+            url = api.build_species_match_url(params)
+            await process.log(
+                f"Could not resolve to taxon key for {name} with rank {rank_field}, attempting to resolve with scientificName",
+                data={"url": url},
+            )
+            result = await _fetch_species_match(url)
+
+        # If still no match, try with verbose=True to get alternatives
+        if not result or not (
+            result.get("usage") and result.get("usage", {}).get("key")
+        ):
+            params = GBIFSpeciesNameMatchParams(scientificName=name, verbose=True)
+            url = api.build_species_match_url(params)
+            await process.log(
+                f"Could not resolve to taxon key for '{name}', trying alternate names with `verbose=true`",
+                data={"url": url},
+            )
+            data = await _fetch_species_match(url)
+            alternatives = data.get("diagnostics", {}).get("alternatives", [])
+            if alternatives:
+                # Format alternatives list
+                first_5 = alternatives[:5]
+                alternatives_text = f"Found {len(alternatives)} alternatives. Here are the first {len(first_5)}:\n\n"
+
+                for alt in first_5:
+                    usage = alt.get("usage", {})
+                    rank = usage.get("rank", "Unknown")
+                    scientific_name = usage.get(
+                        "name", usage.get("scientificName", "Unknown")
+                    )
 
-                        # Extract classification hierarchy
-                        classification = alt.get("classification", [])
-                        classification_names = [
-                            item.get("name", "")
-                            for item in classification
-                            if item.get("name")
-                        ]
-                        classification_str = (
-                            " | ".join(classification_names)
-                            if classification_names
-                            else ""
-                        )
+                    # Extract classification hierarchy
+                    classification = alt.get("classification", [])
+                    classification_names = [
+                        item.get("name", "")
+                        for item in classification
+                        if item.get("name")
+                    ]
+                    classification_str = (
+                        " | ".join(classification_names) if classification_names else ""
+                    )
 
-                        alternatives_text += f'- {rank} "{scientific_name}"'
-                        if classification_str:
-                            alternatives_text += (
-                                f" with classification {classification_str}"
-                            )
-                        alternatives_text += "\n"
+                    alternatives_text += f'- {rank} "{scientific_name}"'
+                    if classification_str:
+                        alternatives_text += (
+                            f" with classification {classification_str}"
+                        )
+                    alternatives_text += "\n"
 
-                    await process.log(alternatives_text)
+                await process.log(alternatives_text)
 
-                    # Use first alternative
-                    first_alt = alternatives[0]
-                    first_usage = first_alt.get("usage", {})
-                    first_scientific_name = first_usage.get(
-                        "name", first_usage.get("scientificName", "Unknown")
-                    )
-                    await process.log(f'Assuming option 1: "{first_scientific_name}"')
-                    result = first_alt
-
-            # generate artifact for the response
-            if result.get("usage") and result.get("usage", {}).get("key"):
-                taxon_key = result["usage"]["key"]
-                taxon_keys.append(taxon_key)
-                await process.create_artifact(
-                    mimetype="application/json",
-                    description=f"GBIF Species Match API call results for: {name}",
-                    uris=[url],
-                    metadata={
-                        "data_source": "GBIF Species Match",
-                    },
+                # Use first alternative
+                first_alt = alternatives[0]
+                first_usage = first_alt.get("usage", {})
+                first_scientific_name = first_usage.get(
+                    "name", first_usage.get("scientificName", "Unknown")
                 )
-                continue
-            else:
-                await process.log(
-                    f"No match or alternatives found for '{name}'",
-                    data={
-                        "data_source": f"GBIF Species Match results for: {name}",
-                        "api_url": url,
-                    },
-                )
-                continue
+                await process.log(f'Assuming option 1: "{first_scientific_name}"')
+                result = first_alt
 
-        except Exception as e:
+        # generate artifact for the response
+        if result.get("usage") and result.get("usage", {}).get("key"):
+            await _create_species_match_artifact(process, name, url, artifact_urls)
+            return result["usage"]["key"]
+        else:
             await process.log(
-                f"Failed to resolve name '{name}': {e}",
+                f"No match or alternatives found for '{name}'",
                 data={
-                    "data_source": f"GBIF Species Match for: {name}",
-                    "error": str(e),
+                    "data_source": f"GBIF Species Match results for: {name}",
+                    "api_url": url,
                 },
             )
-            continue
+            return None
 
-    await process.log(f"Resolved {len(taxon_keys)} out of {len(organisms)} names.")
+    except Exception as e:
+        await process.log(
+            f"Failed to resolve name '{name}': {e}",
+            data={
+                "data_source": f"GBIF Species Match for: {name}",
+                "error": str(e),
+            },
+        )
+        return None
+
+
+async def resolve_names_to_taxonkeys(
+    api: GbifApi, organisms: List[IdentifiedOrganism], process: IChatBioAgentProcess
+) -> Dict[Tuple[str, Optional[str]], int]:
+    """
+    Resolve scientific names to GBIF taxon keys using the species match API.
+
+    Returns:
+        Taxon keys by (scientific name, taxonomic rank), in the order the
+        organisms first appear. Homonyms at different ranks keep one key each.
+
+    Note:
+        This function uses the GBIF /v2/species/match endpoint for fuzzy name matching.
+        Only successfully resolved names will have their taxon keys included in the result.
+        Each API call generates an artifact for tracking purposes.
+    """
+    if not organisms:
+        return {}
+
+    # Resolve each distinct (name, rank) once, concurrently; execute_request
+    # bounds GBIF load
+    unique_organisms = {}
+    for organism in organisms:
+        organism_key = (
+            _name_key(organism.scientific_name),
+            _name_key(organism.taxonomic_rank),
+        )
+        unique_organisms.setdefault(organism_key, organism)
+
+    artifact_urls = set()
+    results = await asyncio.gather(
+        *[
+            _resolve_organism_to_taxon_key(api, organism, process, artifact_urls)
+            for organism in unique_organisms.values()
+        ]
+    )
+    taxon_keys = {}
+    for organism, key in zip(unique_organisms.values(), results):
+        if key is not None:
+            rank = organism.taxonomic_rank
+            taxon_keys[
+                (organism.scientific_name.strip(), rank.strip() if rank else None)
+            ] = key
+
+    await process.log(
+        f"Resolved {len(taxon_keys)} out of {len(unique_organisms)} names."
+    )
     return taxon_keys
 
 
@@ -377,16 +529,20 @@ async def resolve_keys_to_names(
     if not keys:
         return {}
 
-    unique_keys: list[int] = sorted({int(k) for k in keys if k is not None})
-    urls: Dict[str, str] = {
-        str(usage_key): api.build_species_key_search_url(usage_key)
-        for usage_key in unique_keys
-    }
+    # One pass over the keys; URLs are built once per distinct key
+    urls: Dict[str, str] = {}
+    for k in keys:
+        if k is None:
+            continue
+        usage_key = int(k)
+        key_str = str(usage_key)
+        if key_str not in urls:
+            urls[key_str] = api.build_species_key_search_url(usage_key)
     await process.log(
         "Resolving GBIF keys to scientific names",
-        data={"keys": unique_keys, "type": type},
+        data={"keys": sorted(map(int, urls)), "type": type},
     )
-    results = await execute_multiple_requests(urls)
+    results = await cached_execute_multiple_requests(urls, ttl=SPECIES_KEY_CACHE_TTL)
     keys_to_name: Dict[int, str] = {}
     for key_str, payload in results.items():
         try:
@@ -420,7 +576,7 @@ async def resolve_keys_to_names(
 
     await process.log(
         "Resolved GBIF keys to names",
-        data={"resolved": len(keys_to_name), "requested": len(unique_keys)},
+        data={"resolved": len(keys_to_name), "requested": len(urls)},
     )
 
     return keys_to_name
@@ -1,7 +1,11 @@
+import asyncio
 from dotenv import load_dotenv
+import httpx
 import instructor
 from groq import Groq, AsyncGroq
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
 import os
+from typing import Any, Dict, Optional, Tuple
 
 load_dotenv()
 
@@ -9,6 +13,16 @@ default_provider = "openai"
 default_model = "gpt-4.1"
 default_temperature = 0.0
 
+# Connection pool for OpenAI; idle connections are kept warm between requests
+_OPENAI_HTTP_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=32, keepalive_expiry=60
+)
+
+# Clients keyed by their settings. Async clients hold an HTTP connection pool
+# bound to the event loop they were created on, so the cache is per loop.
+_CLIENTS: Dict[Tuple[str, str, float, bool], Any] = {}
+_CLIENTS_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
 
 async def get_client(
     model: str = default_model,
@@ -16,10 +30,32 @@ async def get_client(
     temperature: float = default_temperature,
     async_client: bool = True,
 ):
+    """Return a shared client so LLM calls reuse TCP/TLS connections."""
+    global _CLIENTS_LOOP
+
+    loop = asyncio.get_running_loop()
+    if _CLIENTS_LOOP is not loop:
+        _CLIENTS.clear()
+        _CLIENTS_LOOP = loop
+
+    key = (model, provider, temperature, async_client)
+    client = _CLIENTS.get(key)
+    if client is None:
+        client = _create_client(model, provider, temperature, async_client)
+        _CLIENTS[key] = client
+    return client
+
+
+def _create_client(model: str, provider: str, temperature: float, async_client: bool):
     if provider == "openai":
+        if async_client:
+            http_client = DefaultAsyncHttpxClient(limits=_OPENAI_HTTP_LIMITS)
+        else:
+            http_client = DefaultHttpxClient(limits=_OPENAI_HTTP_LIMITS)
         return instructor.from_provider(
             model=provider + "/" + model,
             async_client=async_client,
+            http_client=http_client,
             temperature=temperature,
         )
     elif provider == "groq":
@@ -30,7 +66,7 @@ async def get_client(
             client = Groq(api_key=api_key)
         return instructor.from_groq(
             client,
-            model="openai/",
+            model=model,
             temperature=temperature,
         )
     else:
@@ -1,10 +1,13 @@
 import os
+import atexit
 import logging
+import queue
 import threading
+import time
 from typing import Any, Callable, TypeVar, Optional, Dict
 from functools import wraps
 from contextlib import asynccontextmanager
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -25,14 +28,34 @@ class LogConfig:
     BACKUP_COUNT = int(os.getenv("GBIF_LOG_BACKUP_COUNT", "5"))
 
 
+class _CleanupFileHandler(TimedRotatingFileHandler):
+    """Daily rotating file handler that removes expired logs on its first write
+    and after each rollover"""
+
+    _swept = False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Runs on the queue listener thread, so the startup sweep never
+        # delays the import or the event loop
+        if not self._swept:
+            self._swept = True
+            cleanup_old_logs()
+        super().emit(record)
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        cleanup_old_logs()
+
+
 # --- Thread-safe logger setup ---
 _logger_lock = threading.Lock()
 _logger_instance: Optional[logging.Logger] = None
+_log_listener: Optional[QueueListener] = None
 
 
 def setup_logger() -> logging.Logger:
     """Setup logger with thread safety and error handling"""
-    global _logger_instance
+    global _logger_instance, _log_listener
 
     if _logger_instance is not None:
         return _logger_instance
@@ -43,7 +66,7 @@ def setup_logger() -> logging.Logger:
             logger = logging.getLogger("gbif.agent")
             logger.setLevel(getattr(logging, LogConfig.LOG_LEVEL))
             logger.handlers.clear()
-            handler = TimedRotatingFileHandler(
+            handler = _CleanupFileHandler(
                 LogConfig.LOG_FILE,
                 when="midnight",
                 interval=1,
@@ -54,8 +77,18 @@ def setup_logger() -> logging.Logger:
             formatter = logging.Formatter(
                 fmt=LogConfig.LOG_FORMAT, datefmt=LogConfig.DATE_FORMAT
             )
+            # DATE_FORMAT is marked UTC ("Z"), so render record times in UTC
+            formatter.converter = time.gmtime
             handler.setFormatter(formatter)
-            logger.addHandler(handler)
+            # Records are queued and written by a background thread, so
+            # logging from async code never blocks the event loop on disk I/O
+            log_queue = queue.SimpleQueue()
+            _log_listener = QueueListener(
+                log_queue, handler, respect_handler_level=True
+            )
+            _log_listener.start()
+            atexit.register(_log_listener.stop)
+            logger.addHandler(QueueHandler(log_queue))
             logger.propagate = False
             _logger_instance = logger
             logger.info("GBIF Agent logging system initialized (PID: %d)", os.getpid())
@@ -87,22 +120,23 @@ def cleanup_old_logs() -> None:
         now = datetime.now(timezone.utc)
         cutoff_time = now.timestamp() - (LogConfig.LOG_TTL_DAYS * 24 * 3600)
 
-        for fname in os.listdir(LogConfig.LOG_DIR):
-            fpath = os.path.join(LogConfig.LOG_DIR, fname)
+        # scandir entries carry the file type, so only candidates are stat'ed
+        with os.scandir(LogConfig.LOG_DIR) as entries:
+            for entry in entries:
+                fname = entry.name
 
-            if not os.path.isfile(fpath):
-                continue
+                # Only clean up log files
+                if not (fname.startswith("gbif_agent") and fname.endswith(".log")):
+                    continue
 
-            # Only clean up log files
-            if not (fname.startswith("gbif_agent") and fname.endswith(".log")):
-                continue
-
-            try:
-                if os.path.getmtime(fpath) < cutoff_time:
-                    os.remove(fpath)
-                    logger.debug(f"Cleaned up old log file: {fname}")
-            except OSError as e:
-                logger.warning(f"Failed to remove old log file {fname}: {e}")
+                try:
+                    if not entry.is_file():
+                        continue
+                    if entry.stat().st_mtime < cutoff_time:
+                        os.remove(entry.path)
+                        logger.debug(f"Cleaned up old log file: {fname}")
+                except OSError as e:
+                    logger.warning(f"Failed to remove old log file {fname}: {e}")
 
     except Exception as e:
         logger.warning(f"Log cleanup failed: {e}")
@@ -110,11 +144,10 @@ def cleanup_old_logs() -> None:
 
 # Initialize
 logger = setup_logger()
-cleanup_old_logs()
 
 
 # --- Logging Utilities ---
-async def log_process_event(event: str, **kwargs) -> None:
+def log_process_event(event: str, **kwargs) -> None:
     """
     Log a process event with all data
 
@@ -122,6 +155,10 @@ async def log_process_event(event: str, **kwargs) -> None:
         event: The event type/name
         **kwargs: Event data
     """
+    # Event data can be large; skip rendering it when INFO is filtered out
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
     try:
         if kwargs:
             details = " | ".join(f"{k}={v}" for k, v in kwargs.items())
@@ -164,110 +201,109 @@ def log_exception(error: Exception, context: str = "") -> None:
         )
 
 
-@asynccontextmanager
-async def wrap_process(process: IChatBioAgentProcess):
+class LoggingProcess:
     """
-    Wrap process methods to add logging with error handling
+    IChatBioAgentProcess that also logs its log and artifact calls
 
-    Args:
-        process: The IChatBioAgentProcess to wrap
+    Everything else is delegated to the wrapped process.
     """
-    original_log = process.log
-    original_create_artifact = process.create_artifact
 
-    async def safe_log_wrapper(msg: str, data: Optional[Dict] = None):
+    __slots__ = ("_process",)
+
+    def __init__(self, process: IChatBioAgentProcess):
+        self._process = process
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._process, name)
+
+    async def log(self, msg: str, data: Optional[Dict] = None):
         """Safely wrap process.log with error handling"""
         try:
-            await log_process_event("process.log", message=msg, data=data)
+            log_process_event("process.log", message=msg, data=data)
         except Exception as e:
             logger.error(f"Failed to log process event: {e}")
 
         try:
-            return await original_log(msg, data)
+            return await self._process.log(msg, data)
         except Exception as e:
             logger.error(f"Original process.log failed: {e}")
             raise
 
-    async def safe_create_artifact_wrapper(*args, **kwargs):
+    async def create_artifact(self, *args, **kwargs):
         """Safely wrap process.create_artifact with error handling"""
         try:
             log_kwargs = {k: v for k, v in kwargs.items() if k != "api_response"}
-            await log_process_event(
-                "process.create_artifact", args=args, kwargs=log_kwargs
-            )
+            log_process_event("process.create_artifact", args=args, kwargs=log_kwargs)
         except Exception as e:
             logger.error(f"Failed to log artifact creation: {e}")
 
         try:
-            return await original_create_artifact(*args, **kwargs)
+            return await self._process.create_artifact(*args, **kwargs)
         except Exception as e:
             logger.error(f"Original create_artifact failed: {e}")
             raise
 
-    # Apply wrappers
-    process.log = safe_log_wrapper
-    process.create_artifact = safe_create_artifact_wrapper
-
-    try:
-        yield process
-    finally:
-        # Always restore original methods
-        try:
-            process.log = original_log
-            process.create_artifact = original_create_artifact
-        except Exception as e:
-            logger.error(f"Failed to restore process methods: {e}")
 
-
-@asynccontextmanager
-async def wrap_context(context: ResponseContext):
+class LoggingContext:
     """
-    Wrap context methods to add logging with error handling
+    ResponseContext that also logs replies and wraps the processes it begins
 
-    Args:
-        context: The ResponseContext to wrap
+    Everything else is delegated to the wrapped context.
     """
-    original_reply = context.reply
-    original_begin_process = context.begin_process
 
-    async def safe_reply_wrapper(msg: str):
+    __slots__ = ("_context",)
+
+    def __init__(self, context: ResponseContext):
+        self._context = context
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._context, name)
+
+    async def reply(self, msg: str):
         """Safely wrap context.reply with error handling"""
         try:
-            await log_process_event("context.reply", message=msg)
+            log_process_event("context.reply", message=msg)
         except Exception as e:
             logger.error(f"Failed to log reply: {e}")
 
         try:
-            return await original_reply(msg)
+            return await self._context.reply(msg)
         except Exception as e:
             logger.error(f"Original context.reply failed: {e}")
             raise
 
     @asynccontextmanager
-    async def safe_begin_process_wrapper(*args, **kwargs):
+    async def begin_process(self, *args, **kwargs):
         """Safely wrap context.begin_process with error handling"""
         try:
-            async with original_begin_process(*args, **kwargs) as process:
-                async with wrap_process(process) as wrapped_process:
-                    yield wrapped_process
+            async with self._context.begin_process(*args, **kwargs) as process:
+                yield LoggingProcess(process)
         except Exception as e:
             logger.error(f"Process wrapper failed: {e}")
             # Re-raise to maintain original behavior
             raise
 
-    # Apply wrappers
-    context.reply = safe_reply_wrapper
-    context.begin_process = safe_begin_process_wrapper
 
-    try:
-        yield context
-    finally:
-        # Always restore original methods
-        try:
-            context.reply = original_reply
-            context.begin_process = original_begin_process
-        except Exception as e:
-            logger.error(f"Failed to restore context methods: {e}")
+@asynccontextmanager
+async def wrap_process(process: IChatBioAgentProcess):
+    """
+    Yield a view of the process whose methods add logging
+
+    Args:
+        process: The IChatBioAgentProcess to wrap
+    """
+    yield LoggingProcess(process)
+
+
+@asynccontextmanager
+async def wrap_context(context: ResponseContext):
+    """
+    Yield a view of the context whose methods add logging
+
+    Args:
+        context: The ResponseContext to wrap
+    """
+    yield LoggingContext(context)
 
 
 # Type variable for function parameters
@@ -288,17 +324,17 @@ def with_logging(entrypoint_id: str):
     def decorator(func: Callable[[ResponseContext, str, P], Any]):
         @wraps(func)
         async def wrapper(context: ResponseContext, request: str):
-            start_time = datetime.now(timezone.utc)
+            start_time = time.monotonic()
 
             try:
                 logger.info(f"ENTRY | Entrypoint={entrypoint_id} | Request={request}")
 
                 # Execute with logging context
-                async with wrap_context(context):
-                    result = await func(context, request)
+                async with wrap_context(context) as logged_context:
+                    result = await func(logged_context, request)
 
                 # Log successful completion
-                duration = (datetime.now(timezone.utc) - start_time).total_seconds()
+                duration = time.monotonic() - start_time
                 logger.info(
                     f"SUCCESS | Entrypoint={entrypoint_id} | Duration={duration:.3f}s"
                 )
@@ -306,7 +342,7 @@ def with_logging(entrypoint_id: str):
                 return result
 
             except Exception as e:
-                duration = (datetime.now(timezone.utc) - start_time).total_seconds()
+                duration = time.monotonic() - start_time
                 log_exception(
                     e, f"Entrypoint={entrypoint_id} | Duration={duration:.3f}s"
                 )
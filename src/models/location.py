@@ -1,4 +1,4 @@
-from typing import Optional, List, Tuple, Dict
+from typing import Optional, Iterator, List, Tuple, Dict
 from enum import Enum
 from pydantic import BaseModel, Field
 from src.enums.common import CountryEnum
@@ -140,6 +140,27 @@ class Location(BaseModel):
 
         return hierarchy
 
+    def iter_hierarchy_ascending(self) -> Iterator[Tuple[int, str, str]]:
+        """
+        Yield (gadm_level, level_name, place_name) from least to most specific.
+
+        Same entries as get_hierarchy(), in the order the GADM resolver walks
+        them, without building and reversing a list.
+
+        Example:
+            >>> loc = Location(country="USA", state="Florida", county="Alachua")
+            >>> list(loc.iter_hierarchy_ascending())
+            [(0, 'country', 'USA'), (1, 'state', 'Florida'), (2, 'county', 'Alachua')]
+        """
+        if self.country:
+            yield (0, "country", self.country)
+        if self.state:
+            yield (1, "state", self.state)
+        if self.county:
+            yield (2, "county", self.county)
+        if self.locality:
+            yield (3, "locality", self.locality)
+
     def get_parent_constraints(self, for_level: int) -> Dict[int, str]:
         """
         Get parent location names for disambiguating at a given level.
@@ -252,7 +273,7 @@ class GADMMatch(BaseModel):
         description="Hierarchy of location information that was found in GADM",
     )
     query_trace: Optional[List[str]] = Field(
-        default=None,
+        default_factory=list,
         description="Trace of queries made to GADM",
     )
 
@@ -260,7 +281,15 @@ class GADMMatch(BaseModel):
 class ResolvedLocation(Location, GADMMatch):
     """Location merged with GADM resolution - all fields flattened."""
 
-    pass
+    @classmethod
+    def from_parts(cls, location: Location, match: GADMMatch) -> "ResolvedLocation":
+        """
+        Merge an already-validated Location and GADMMatch without re-validating.
+
+        Equivalent to ResolvedLocation(**location.model_dump(), **match.model_dump())
+        but skips the intermediate dicts and the second validation pass.
+        """
+        return cls.model_construct(**location.__dict__, **match.__dict__)
 
 
 class EnrichedLocation(BaseModel):
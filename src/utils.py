@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, model_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 from typing import Optional, Union
 import dataclasses
+import functools
 import json
 from src.log import logger
 from src.models.location import Location
@@ -56,6 +57,11 @@ class IdentifiedOrganism(BaseModel):
         description="The taxonomic rank of the scientific name (e.g., 'species', 'genus', 'family', 'order', 'class')",
     )
 
+    @field_validator("taxonomic_rank")
+    @classmethod
+    def normalize_taxonomic_rank(cls, rank: str) -> str:
+        return rank.strip().lower()
+
 
 class UserRequestExpansion(BaseModel):
     reasoning: str = Field(
@@ -195,16 +201,20 @@ def serialize_entities(entities: list) -> list:
     return [entity.model_dump(exclude_none=True, mode="json") for entity in entities]
 
 
+@functools.lru_cache(maxsize=None)
+def _get_preprocess_prompt() -> str:
+    """Read the request preprocessing system prompt once per process."""
+    with open("src/resources/prompts/preprocess_request.md", "r") as file:
+        return file.read()
+
+
 async def _preprocess_user_request(user_request: str):
     """
     Translates organism-related terms in user request to scientific nomenclature
     and extracts location information.
     """
-    with open("src/resources/prompts/preprocess_request.md", "r") as file:
-        system_prompt = file.read()
-
     messages = [
-        {"role": "system", "content": system_prompt},
+        {"role": "system", "content": _get_preprocess_prompt()},
         {"role": "user", "content": f"User request: {user_request}"},
     ]
 
@@ -6,6 +6,7 @@ import pytest
 from ichatbio.agent_response import ResponseChannel, ResponseContext, ResponseMessage
 
 from src.agent import GBIFAgent
+from src.gbif.parser import clear_parse_cache
 
 
 class InMemoryResponseChannel(ResponseChannel):
@@ -19,6 +20,14 @@ class InMemoryResponseChannel(ResponseChannel):
 TEST_CONTEXT_ID = "617727d1-4ce8-4902-884c-db786854b51c"
 
 
+@pytest.fixture(autouse=True)
+def empty_parse_cache():
+    """Keep parse results from leaking between tests that patch the LLM client."""
+    clear_parse_cache()
+    yield
+    clear_parse_cache()
+
+
 @pytest.fixture(scope="function")
 def agent():
     return GBIFAgent()
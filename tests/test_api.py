@@ -1,14 +1,10 @@
+from urllib.parse import urlencode
+
 import pytest
 from src.gbif.api import GbifApi
-from src.gbif.fetch import execute_sync_request
 from src.models.entrypoints import GBIFOccurrenceSearchParams, GBIFOccurrenceFacetsParams
-from src.models.enums.occurence_parameters import (
-    BasisOfRecordEnum,
-    ContinentEnum,
-    OccurrenceStatusEnum,
-    LicenseEnum,
-    MediaObjectTypeEnum,
-)
+from src.enums.common import ContinentEnum, LicenseEnum, MediaObjectTypeEnum
+from src.enums.occurrences import BasisOfRecordEnum, OccurrenceStatusEnum
 
 
 @pytest.fixture
@@ -16,11 +12,6 @@ def url_builder():
     return GbifApi()
 
 
-@pytest.fixture
-def fetcher():
-    return execute_sync_request()
-
-
 def test_api_initialization(url_builder):
     assert url_builder.base_url == "https://api.gbif.org/v1"
     assert url_builder.portal_url == "https://gbif.org"
@@ -80,6 +71,49 @@ def test_url_building(url_builder):
     assert portal_url == "https://gbif.org/occurrence/search?q=test"
 
 
+def _plain_query(url_builder, params, **overrides):
+    """Query string as the builders encoded it before memoization."""
+    api_params = url_builder._convert_to_api_params(params)
+    api_params.update(overrides)
+    return urlencode(api_params, doseq=True)
+
+
+def test_urls_keep_parameter_order(url_builder):
+    search_params = GBIFOccurrenceSearchParams(  # type: ignore
+        scientificName=["Homo sapiens", "Puma concolor"],
+        basisOfRecord=[BasisOfRecordEnum.HUMAN_OBSERVATION],
+        year="2020,2023",
+        hasCoordinate=True,
+        limit=20,
+        offset=40,
+    )
+    assert url_builder.build_occurrence_search_url(search_params) == (
+        "https://api.gbif.org/v1/occurrence/search?"
+        + _plain_query(url_builder, search_params)
+    )
+
+    facets_params = GBIFOccurrenceFacetsParams(  # type: ignore
+        facet=["kingdom", "country"], facetMincount=5, country=["US"]
+    )
+    assert url_builder.build_occurrence_facets_url(facets_params) == (
+        "https://api.gbif.org/v1/occurrence/search?"
+        + _plain_query(url_builder, facets_params, limit=0)
+    )
+
+
+def test_portal_url_keeps_the_portal_query_form(url_builder):
+    api_url = (
+        "https://api.gbif.org/v1/occurrence/search?"
+        "scientificName=Puma+concolor&country=US&country=MX&year=2020%2C2023"
+        "&limit=0&facet=country&facetLimit=10"
+    )
+
+    assert url_builder.build_portal_url(api_url) == (
+        "https://gbif.org/occurrence/search?"
+        "scientificName=Puma concolor&country=US,MX&year=2020,2023"
+    )
+
+
 def test_complex_search_params(url_builder):
     """Test complex search parameters with multiple filters."""
     params = GBIFOccurrenceSearchParams(  # type: ignore
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from src.gbif import cache
+
+
+@pytest.fixture
+def gbif_cache(tmp_path, monkeypatch):
+    """Point the GBIF cache at a fresh file and record outgoing requests."""
+    requests = []
+
+    async def fake_execute_request(url):
+        requests.append(url)
+        return {"key": len(requests), "status_code": 200}
+
+    async def fake_execute_multiple_requests(urls):
+        requests.extend(urls.values())
+        return {
+            name: {"error": "not found"} if "fail" in url else {"url": url}
+            for name, url in urls.items()
+        }
+
+    monkeypatch.setattr(cache, "execute_request", fake_execute_request)
+    monkeypatch.setattr(
+        cache, "execute_multiple_requests", fake_execute_multiple_requests
+    )
+    monkeypatch.setattr(cache, "GBIF_CACHE_PATH", str(tmp_path / "gbif_cache.sqlite"))
+    cache._close_connection()
+    yield requests
+    cache._close_connection()
+
+
+@pytest.mark.asyncio
+async def test_responses_survive_a_new_connection(gbif_cache):
+    first = await cache.cached_execute_request("match?name=Puma")
+    cache._close_connection()
+    second = await cache.cached_execute_request("match?name=Puma")
+
+    assert gbif_cache == ["match?name=Puma"]
+    assert first == second == {"key": 1, "status_code": 200}
+
+
+@pytest.mark.asyncio
+async def test_expired_responses_are_refetched(gbif_cache):
+    await cache.cached_execute_request("match?name=Puma", ttl=0)
+    result = await cache.cached_execute_request("match?name=Puma")
+
+    assert result["key"] == 2
+
+
+@pytest.mark.asyncio
+async def test_multiple_requests_fetch_only_misses(gbif_cache):
+    await cache.cached_execute_multiple_requests({"1": "species/1", "2": "fail/2"})
+    results = await cache.cached_execute_multiple_requests(
+        {"1": "species/1", "2": "fail/2", "3": "species/3"}
+    )
+
+    assert gbif_cache == ["species/1", "fail/2", "fail/2", "species/3"]
+    assert list(results) == ["1", "2", "3"]
+    assert results["1"] == {"url": "species/1"}
+    assert "error" in results["2"]
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_fetches(gbif_cache, monkeypatch):
+    monkeypatch.setattr(cache, "GBIF_CACHE_PATH", "")
+
+    await cache.cached_execute_request("match?name=Puma")
+    await cache.cached_execute_request("match?name=Puma")
+
+    assert len(gbif_cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_sqlite_work_runs_off_the_event_loop(gbif_cache, monkeypatch):
+    threads = []
+    lookup = cache._lookup
+
+    def recording_lookup(urls):
+        threads.append(threading.get_ident())
+        return lookup(urls)
+
+    monkeypatch.setattr(cache, "_lookup", recording_lookup)
+
+    await cache.cached_execute_request("match?name=Puma")
+    await cache.cached_execute_multiple_requests({"1": "species/1"})
+
+    assert len(threads) == 2
+    assert threading.get_ident() not in threads
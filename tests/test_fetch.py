@@ -0,0 +1,156 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.gbif import fetch
+
+
+class MockGbif:
+    """Serves queued (status_code, headers) responses and records what happens."""
+
+    def __init__(self):
+        self.responses = []
+        self.requested = []
+        self.delays = []
+        self.clients = []
+
+    def handler(self, request):
+        self.requested.append(str(request.url))
+        status_code, headers = self.responses.pop(0)
+        return httpx.Response(status_code, headers=headers, json={"ok": True})
+
+    def create_client(self):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        self.clients.append(client)
+        return client
+
+
+@pytest.fixture
+def gbif(monkeypatch):
+    """Serve execute_request from a mock transport, recording retry delays."""
+    mock = MockGbif()
+    retry_delay = fetch._retry_delay
+
+    def record_delay(headers, attempt):
+        mock.delays.append(retry_delay(headers, attempt))
+        return 0
+
+    monkeypatch.setattr(fetch, "_create_async_client", mock.create_client)
+    monkeypatch.setattr(fetch, "_retry_delay", record_delay)
+    monkeypatch.setattr(fetch, "_ASYNC_CLIENT", None)
+    return mock
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_with_backoff(gbif):
+    gbif.responses += [(503, {}), (502, {}), (200, {})]
+
+    result = await fetch.execute_request("https://api.gbif.org/v1/occurrence")
+
+    assert result == {"ok": True, "status_code": 200}
+    assert len(gbif.requested) == 3
+    first, second = gbif.delays
+    assert 0.25 <= first < 0.35
+    assert 0.5 <= second < 0.6
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honored(gbif):
+    gbif.responses += [(503, {"Retry-After": "2"}), (200, {})]
+
+    await fetch.execute_request("https://api.gbif.org/v1/occurrence")
+
+    assert gbif.delays == [2.0]
+
+
+@pytest.mark.asyncio
+async def test_non_transient_errors_are_not_retried(gbif):
+    gbif.responses += [(501, {})]
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await fetch.execute_request("https://api.gbif.org/v1/occurrence")
+
+    assert len(gbif.requested) == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_after_max_retries(gbif):
+    gbif.responses += [(503, {})] * 3
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await fetch.execute_request("https://api.gbif.org/v1/occurrence", max_retries=2)
+
+    assert len(gbif.requested) == 3
+    assert len(gbif.delays) == 2
+
+
+def test_client_is_closed_when_its_loop_shuts_down(gbif):
+    gbif.responses += [(200, {}), (200, {})]
+
+    for _ in range(2):
+        asyncio.run(fetch.execute_request("https://api.gbif.org/v1/occurrence"))
+
+    first, second = gbif.clients
+    assert first is not second
+    assert first.is_closed and second.is_closed
+
+
+@pytest.fixture
+def fanout_requests(monkeypatch):
+    """Record fan-out requests; "slow" URLs hang and "fail" URLs raise."""
+    requested = []
+
+    async def fake_execute_request(url):
+        requested.append(url)
+        if "slow" in url:
+            await asyncio.sleep(10)
+        if "fail" in url:
+            raise RuntimeError("GBIF unavailable")
+        return {"url": url}
+
+    monkeypatch.setattr(fetch, "execute_request", fake_execute_request)
+    return requested
+
+
+@pytest.mark.asyncio
+async def test_fanout_shares_duplicate_urls(fanout_requests):
+    results = await fetch.execute_multiple_requests(
+        {
+            "counts": "https://gbif/a",
+            "facets": "https://gbif/a",
+            "other": "https://gbif/b",
+        }
+    )
+
+    assert sorted(fanout_requests) == ["https://gbif/a", "https://gbif/b"]
+    assert results["counts"] is results["facets"]
+    assert results["other"] == {"url": "https://gbif/b"}
+
+
+@pytest.mark.asyncio
+async def test_fanout_reports_timeouts_and_failures_per_endpoint(
+    fanout_requests, monkeypatch
+):
+    monkeypatch.setattr(fetch, "GBIF_FANOUT_TIMEOUT", 0.05)
+
+    results = await fetch.execute_multiple_requests(
+        {
+            "slow": "https://gbif/slow",
+            "fail": "https://gbif/fail",
+            "ok": "https://gbif/ok",
+        }
+    )
+
+    assert results["slow"] == {"error": "Request timed out after 0.05s"}
+    assert results["fail"] == {"error": "GBIF unavailable"}
+    assert results["ok"] == {"url": "https://gbif/ok"}
+
+
+@pytest.mark.asyncio
+async def test_fanout_is_unbounded_by_default(fanout_requests):
+    assert fetch.GBIF_FANOUT_TIMEOUT is None
+
+    results = await fetch.execute_multiple_requests({"ok": "https://gbif/ok"})
+
+    assert results == {"ok": {"url": "https://gbif/ok"}}
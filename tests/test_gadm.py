@@ -0,0 +1,321 @@
+import sqlite3
+
+import pytest
+
+from src.gadm import gadm
+from src.models.location import Location, GadmMatchType, ResolvedLocation
+
+
+ROWS = [
+    # GID_0, NAME_0, GID_1, NAME_1, VARNAME_1, NL_NAME_1, GID_2, NAME_2, VARNAME_2
+    ("USA", "United States", "USA.10_1", "Florida", "FL", None, "USA.10.1_1", "Alachua", None),
+    ("USA", "United States", "USA.10_1", "Florida", "FL", None, "USA.10.2_1", "Baker", None),
+    ("USA", "United States", "USA.5_1", "California", "CA", None, "USA.5.1_1", "Alameda", None),
+    ("IND", "India", "IND.16_1", "Karnataka", None, "ಕರ್ನಾಟಕ", "IND.16.1_1", "Bagalkot", "Bagalkote"),
+]
+
+
+@pytest.fixture
+def gadm_db(tmp_path, monkeypatch):
+    """Build a tiny GeoPackage-shaped database and point the GADM module at it."""
+    path = tmp_path / "gadm.gpkg"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE gpkg_contents (table_name TEXT, data_type TEXT)")
+    conn.execute("INSERT INTO gpkg_contents VALUES ('gadm_410', 'features')")
+    conn.execute(
+        'CREATE TABLE "gadm_410" (fid INTEGER PRIMARY KEY, GID_0 TEXT, NAME_0 TEXT, '
+        "GID_1 TEXT, NAME_1 TEXT, VARNAME_1 TEXT, NL_NAME_1 TEXT, "
+        "GID_2 TEXT, NAME_2 TEXT, VARNAME_2 TEXT, geom BLOB)"
+    )
+    conn.executemany(
+        'INSERT INTO "gadm_410" (GID_0, NAME_0, GID_1, NAME_1, VARNAME_1, NL_NAME_1, '
+        "GID_2, NAME_2, VARNAME_2) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ROWS,
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(gadm, "GADM_GPKG_PATH", str(path))
+    monkeypatch.setattr(gadm, "GADM_INDEX_PATH", str(tmp_path / "gadm_index.sqlite"))
+    gadm._close_connections()
+    yield path
+    gadm._close_connections()
+
+
+def test_complete_match(gadm_db):
+    match = gadm.perform_match(
+        Location(country="United States", state="Florida", county="Alachua")
+    )
+
+    assert match.match_type == GadmMatchType.COMPLETE
+    assert match.gadm_hierarchy.level_0.gid == "USA"
+    assert match.gadm_hierarchy.level_1.gid == "USA.10_1"
+    assert match.gadm_hierarchy.level_2.gid == "USA.10.1_1"
+    assert match.gadm_hierarchy.level_2.name == "Alachua"
+    assert match.query_trace == []
+
+
+def test_match_is_case_insensitive_and_uses_variant_names(gadm_db):
+    match = gadm.perform_match(Location(country="united states", state="fl"))
+
+    assert match.match_type == GadmMatchType.COMPLETE
+    assert match.gadm_hierarchy.level_1.name == "Florida"
+
+
+def test_partial_match_stops_at_first_miss(gadm_db):
+    match = gadm.perform_match(
+        Location(country="United States", state="Florida", county="Bagalkot")
+    )
+
+    assert match.match_type == GadmMatchType.PARTIAL
+    assert match.gadm_hierarchy.level_1.gid == "USA.10_1"
+    assert match.gadm_hierarchy.level_2 is None
+
+
+def test_parent_constraint_rejects_other_branches(gadm_db):
+    match = gadm.perform_match(Location(country="India", state="Florida"))
+
+    assert match.match_type == GadmMatchType.PARTIAL
+    assert match.gadm_hierarchy.level_0.gid == "IND"
+    assert match.gadm_hierarchy.level_1 is None
+
+
+def test_skipped_level_stops_narrowing(gadm_db):
+    match = gadm.perform_match(Location(country="United States", county="Alachua"))
+
+    assert match.match_type == GadmMatchType.PARTIAL
+    assert match.gadm_hierarchy.level_0.gid == "USA"
+    assert match.gadm_hierarchy.level_2 is None
+
+
+def test_unconstrained_lookup_builds_full_hierarchy(gadm_db):
+    match = gadm.perform_match(Location(county="Bagalkote"))
+
+    assert match.match_type == GadmMatchType.COMPLETE
+    assert match.gadm_hierarchy.level_0.name == "India"
+    assert match.gadm_hierarchy.level_2.gid == "IND.16.1_1"
+
+
+def test_trace_uses_private_connection(gadm_db):
+    match = gadm.perform_match(
+        Location(country="India", state="Karnataka", county="Bagalkot"), trace=True
+    )
+
+    assert match.match_type == GadmMatchType.COMPLETE
+    assert match.query_trace
+    assert "'Bagalkot'" in match.query_trace[0]
+    assert "'IND.16_1'" in match.query_trace[0]
+
+
+def test_shallow_levels_do_not_query_sqlite(gadm_db):
+    match = gadm.perform_match(Location(country="india", state="karnataka"), trace=True)
+
+    assert match.match_type == GadmMatchType.COMPLETE
+    assert match.gadm_hierarchy.level_1.gid == "IND.16_1"
+    assert match.query_trace == []
+
+
+def test_memory_index_depth_does_not_change_matches(gadm_db, monkeypatch):
+    locations = [
+        Location(country="United States", state="fl", county="Baker"),
+        Location(country="India", state="Florida"),
+        Location(state="Karnataka"),
+        Location(county="Bagalkote"),
+    ]
+    expected = [gadm.perform_match(loc) for loc in locations]
+
+    for max_level in (0, 3):
+        gadm._close_connections()
+        monkeypatch.setattr(gadm, "GADM_MEMORY_MAX_LEVEL", max_level)
+        assert [gadm.perform_match(loc) for loc in locations] == expected
+
+
+def test_memory_max_level_is_clamped_to_gadm_levels():
+    assert gadm._parse_memory_max_level("-1") == 0
+    assert gadm._parse_memory_max_level("2") == 2
+    assert gadm._parse_memory_max_level("9") == 3
+
+
+@pytest.mark.parametrize("memory_max_level", [0, 1])
+def test_ambiguous_names_resolve_in_layer_order(gadm_db, monkeypatch, memory_max_level):
+    # The first feature named Springfield sorts after the second by GID
+    conn = sqlite3.connect(gadm_db)
+    conn.executemany(
+        'INSERT INTO "gadm_410" (GID_0, NAME_0, GID_1, NAME_1, GID_2, NAME_2) '
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            ("ZAF", "South Africa", "ZAF.9_1", "Springfield", "ZAF.9.1_1", "Oak"),
+            ("AUS", "Australia", "AUS.1_1", "Springfield", "AUS.1.1_1", "Oak"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(gadm, "GADM_MEMORY_MAX_LEVEL", memory_max_level)
+
+    state = gadm.perform_match(Location(state="Springfield"))
+    county = gadm.perform_match(Location(county="Oak"))
+
+    assert state.gadm_hierarchy.level_1.gid == "ZAF.9_1"
+    assert county.gadm_hierarchy.level_2.gid == "ZAF.9.1_1"
+
+
+def test_name_index_is_built_once(gadm_db):
+    gadm.perform_match(Location(country="India"))
+    index_mtime = (gadm_db.parent / "gadm_index.sqlite").stat().st_mtime_ns
+
+    gadm._close_connections()
+    gadm.perform_match(Location(country="India"))
+
+    assert (gadm_db.parent / "gadm_index.sqlite").stat().st_mtime_ns == index_mtime
+
+
+def test_name_index_with_old_schema_is_rebuilt(gadm_db):
+    index_path = gadm_db.parent / "gadm_index.sqlite"
+    conn = sqlite3.connect(index_path)
+    conn.execute("PRAGMA user_version = 1")
+    conn.close()
+
+    match = gadm.perform_match(Location(country="India", state="Karnataka"))
+
+    assert match.match_type == GadmMatchType.COMPLETE
+    conn = sqlite3.connect(index_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == gadm.GADM_INDEX_VERSION
+    conn.close()
+
+
+def test_name_index_falls_back_when_its_directory_is_not_writable(
+    gadm_db, monkeypatch
+):
+    unwritable_path = gadm_db.parent / "missing" / "gadm_index.sqlite"
+    fallback_path = gadm_db.parent / "cache" / "gadm_index.sqlite"
+    monkeypatch.setattr(gadm, "GADM_INDEX_PATH", str(unwritable_path))
+    monkeypatch.setattr(gadm, "GADM_INDEX_FALLBACK_PATH", str(fallback_path))
+
+    match = gadm.perform_match(Location(country="India", state="Karnataka"))
+
+    assert match.match_type == GadmMatchType.COMPLETE
+    assert fallback_path.exists()
+    assert not unwritable_path.parent.exists()
+
+
+def test_connection_is_tuned_for_read_only_lookups(gadm_db):
+    conn = gadm._get_thread_connection()
+
+    assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+    assert conn.execute("PRAGMA gadm_index.cache_size").fetchone()[0] == (
+        -gadm.GADM_CACHE_SIZE_KIB
+    )
+
+
+def test_chain_projects_only_requested_levels(gadm_db):
+    match = gadm.perform_match(
+        Location(country="India", state="Karnataka", county="Bagalkot"), trace=True
+    )
+
+    assert '"GID_2"' in match.query_trace[0]
+    assert '"GID_3"' not in match.query_trace[0]
+
+
+def test_no_match(gadm_db):
+    match = gadm.perform_match(Location(country="Atlantis"))
+
+    assert match.match_type == GadmMatchType.NONE
+    assert match.gadm_hierarchy is None
+
+
+@pytest.mark.asyncio
+async def test_map_locations_to_gadm(gadm_db):
+    resolved = await gadm.map_locations_to_gadm(
+        [Location(country="India", state="Karnataka"), Location(country="Atlantis")]
+    )
+
+    assert [r.match_type for r in resolved] == [
+        GadmMatchType.COMPLETE,
+        GadmMatchType.NONE,
+    ]
+    assert resolved[0].country == "India"
+    assert resolved[0].gadm_hierarchy.level_1.gid == "IND.16_1"
+    assert [r.query_trace for r in resolved] == [[], []]
+    assert all(loc["query_trace"] == [] for loc in gadm.serialize_locations(resolved))
+
+
+@pytest.mark.asyncio
+async def test_map_locations_to_gadm_keeps_input_order(gadm_db):
+    locations = [
+        Location(country="United States", state="Florida", county=county)
+        for county in ("Alachua", "Baker", "alachua")
+    ]
+
+    resolved = await gadm.map_locations_to_gadm(locations)
+
+    assert [r.gadm_hierarchy.level_2.gid for r in resolved] == [
+        "USA.10.1_1",
+        "USA.10.2_1",
+        "USA.10.1_1",
+    ]
+
+
+def test_repeated_lookups_are_memoized(gadm_db):
+    gadm.perform_match(
+        Location(country="United States", state="Florida", county="Alachua")
+    )
+    gadm.perform_match(
+        Location(country="united states", state="FLORIDA", county="ALACHUA")
+    )
+
+    info = gadm._find_chain_cached.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_batched_matches_equal_single_matches(gadm_db, monkeypatch):
+    locations = [
+        Location(country="United States", state="Florida", county="Alachua"),
+        Location(country="United States", state="Florida", county="baker"),
+        Location(country="united states", state="FL", county="ALACHUA"),
+        Location(country="United States", state="California", county="Alachua"),
+        Location(country="India", state="Karnataka", county="Bagalkote"),
+        Location(county="Bagalkot"),
+        Location(state="California", county="Alameda"),
+        Location(country="Atlantis", county="Alachua"),
+        Location(),
+    ]
+    expected = [gadm.perform_match(loc) for loc in locations]
+
+    # Force several SQL chunks per chain shape and several batches
+    monkeypatch.setattr(gadm, "GADM_BATCH_SIZE", 2)
+    resolved = await gadm.map_locations_to_gadm(locations)
+
+    assert [(r.match_type, r.gadm_hierarchy) for r in resolved] == [
+        (m.match_type, m.gadm_hierarchy) for m in expected
+    ]
+
+
+def test_chain_batches_split_by_variable_limit(gadm_db):
+    conn = gadm._get_thread_connection()
+    # Two steps bind six values, so every chain of this shape gets its own chunk
+    conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 6)
+    chains = [
+        (((1, "FLORIDA"), (2, "NOWHERE")), None),
+        (((1, "FLORIDA"), (2, "BAKER")), None),
+        (((1, "KARNATAKA"), (2, "BAGALKOTE")), None),
+    ]
+
+    matches = gadm._find_chains_batch(conn, chains)
+
+    assert matches == {chain: gadm._find_chain(conn, *chain) for chain in chains}
+    assert [matches[chain][0] for chain in chains] == [1, 2, 2]
+
+
+def test_resolved_location_from_parts_matches_validated_model(gadm_db):
+    loc = Location(country="India", state="Karnataka", state_iso="KA")
+    match = gadm.perform_match(loc)
+
+    merged = ResolvedLocation.from_parts(loc, match)
+
+    assert merged == ResolvedLocation(**loc.model_dump(), **match.model_dump())
+    assert merged.model_dump(exclude_none=True, mode="json") == (
+        ResolvedLocation(**loc.model_dump(), **match.model_dump()).model_dump(
+            exclude_none=True, mode="json"
+        )
+    )
@@ -0,0 +1,106 @@
+import atexit
+import logging
+import os
+import time
+
+import pytest
+
+from src import log
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    """Point the log files at tmp_path; the original logger is restored after."""
+    monkeypatch.setattr(log.LogConfig, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(log.LogConfig, "LOG_FILE", str(tmp_path / "gbif_agent.log"))
+    monkeypatch.setattr(log, "_logger_instance", None)
+    monkeypatch.setattr(log, "_log_listener", None)
+    agent_logger = logging.getLogger("gbif.agent")
+    handlers = agent_logger.handlers[:]
+    yield tmp_path
+    if log._log_listener is not None:
+        atexit.unregister(log._log_listener.stop)
+        log._log_listener.stop()
+        for handler in log._log_listener.handlers:
+            handler.close()
+    agent_logger.handlers[:] = handlers
+
+
+def test_records_reach_the_file_through_the_listener(log_dir):
+    test_logger = log.setup_logger()
+    test_logger.info("occurrence search for %s", "Puma concolor")
+    # Stopping the listener drains the queue into the file handler
+    log._log_listener.stop()
+    log._log_listener.start()
+
+    assert [type(h) for h in test_logger.handlers] == [log.QueueHandler]
+    text = (log_dir / "gbif_agent.log").read_text(encoding="utf-8")
+    assert "[INFO] gbif.agent | occurrence search for Puma concolor" in text
+
+
+def test_first_write_sweeps_expired_logs_once(log_dir, monkeypatch):
+    expired = log_dir / "gbif_agent.2020-01-01.log"
+    expired.write_text("old")
+    expired_at = time.time() - (log.LogConfig.LOG_TTL_DAYS + 1) * 24 * 3600
+    os.utime(expired, (expired_at, expired_at))
+
+    sweeps = []
+    cleanup_old_logs = log.cleanup_old_logs
+
+    def counting_cleanup():
+        sweeps.append(1)
+        cleanup_old_logs()
+
+    monkeypatch.setattr(log, "cleanup_old_logs", counting_cleanup)
+    handler = log._CleanupFileHandler(
+        log.LogConfig.LOG_FILE, when="midnight", utc=True, encoding="utf-8"
+    )
+    try:
+        for _ in range(2):
+            handler.emit(logging.makeLogRecord({"msg": "hello"}))
+    finally:
+        handler.close()
+
+    assert sweeps == [1]
+    assert not expired.exists()
+    assert (log_dir / "gbif_agent.log").exists()
+
+
+def test_process_events_are_not_rendered_below_info(monkeypatch):
+    rendered = []
+    messages = []
+
+    class EventData:
+        def __str__(self):
+            rendered.append(1)
+            return "data"
+
+    monkeypatch.setattr(log.logger, "info", messages.append)
+    level = log.logger.level
+    log.logger.setLevel(logging.WARNING)
+    try:
+        log.log_process_event("process.log", data=EventData())
+    finally:
+        log.logger.setLevel(level)
+
+    assert rendered == [] and messages == []
+
+    log.log_process_event("process.log", data=EventData())
+    assert messages == ["process.log | data=data"]
+
+
+@pytest.mark.asyncio
+async def test_logging_process_logs_and_delegates():
+    class Process:
+        artifact_count = 0
+
+        async def log(self, msg, data=None):
+            return (msg, data)
+
+    process = log.LoggingProcess(Process())
+
+    assert await process.log("resolving", {"name": "Puma"}) == (
+        "resolving",
+        {"name": "Puma"},
+    )
+    assert process.artifact_count == 0
@@ -1,6 +1,8 @@
+import asyncio
 import pytest
 from unittest.mock import patch, AsyncMock
 from pydantic import BaseModel, Field
+from src.gbif import parser
 from src.gbif.parser import parse, create_response_model
 
 
@@ -66,3 +68,74 @@ async def test_parse_success_and_message_structure(
         {"role": "system", "content": messages[0]["content"]},
         {"role": "user", "content": "find birds"},
     ]
+
+
+@pytest.mark.asyncio
+async def test_parse_many_keeps_order_and_failures(monkeypatch):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_parse(request, entrypoint_id, parameters_model, information):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if request == "fail":
+            raise ValueError("bad request")
+        return request.upper()
+
+    monkeypatch.setattr(parser, "parse", fake_parse)
+    monkeypatch.setattr(parser, "GBIF_LLM_MAX_CONCURRENCY", 2)
+
+    results = await parser.parse_many(
+        ["a", "fail", "b", "c"], "find_occurrence_records", MockParameters
+    )
+
+    assert results[0] == "A"
+    assert isinstance(results[1], ValueError)
+    assert results[2:] == ["B", "C"]
+    assert max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_parse_requests_reuse_the_result(monkeypatch):
+    calls = []
+
+    async def fake_request_parameters(request, messages, response_model):
+        calls.append(request)
+        return response_model(
+            plan=request,
+            params=MockParameters(species=request),
+            artifact_description=request,
+        )
+
+    monkeypatch.setattr(parser, "_request_parameters", fake_request_parameters)
+    monkeypatch.setattr(parser, "PARSE_CACHE_SIZE", 256)
+
+    first = await parse("find pumas", "find_occurrence_records", MockParameters)
+    second = await parse("find pumas", "find_occurrence_records", MockParameters)
+    other = await parse("find lynx", "find_occurrence_records", MockParameters)
+
+    assert calls == ["find pumas", "find lynx"]
+    assert first == second
+    assert first.params is not second.params
+    assert other.params.species == "find lynx"
+
+
+@pytest.mark.asyncio
+async def test_parse_cache_can_be_disabled(monkeypatch):
+    calls = []
+
+    async def fake_request_parameters(request, messages, response_model):
+        calls.append(request)
+        return MockParameters(species=request)
+
+    monkeypatch.setattr(parser, "_request_parameters", fake_request_parameters)
+    monkeypatch.setattr(parser, "PARSE_CACHE_SIZE", 0)
+
+    for _ in range(2):
+        await parse("find pumas", "find_occurrence_records", MockParameters)
+
+    assert calls == ["find pumas", "find pumas"]
+    assert not parser._PARSE_CACHE
@@ -0,0 +1,208 @@
+import asyncio
+
+import pytest
+
+from src.gbif import cache, resolve_parameters
+from src.gbif.api import GbifApi
+from src.utils import IdentifiedOrganism
+
+
+@pytest.fixture
+def species_match_requests(monkeypatch):
+    """Record species match requests instead of sending them to GBIF."""
+    requests = []
+
+    async def fake_execute_request(url):
+        requests.append(url)
+        key = len(requests)
+        await asyncio.sleep(0)
+        if "fail" in url:
+            raise RuntimeError("GBIF unavailable")
+        return {"usage": {"key": key}, "status_code": 200}
+
+    monkeypatch.setattr(cache, "execute_request", fake_execute_request)
+    monkeypatch.setattr(cache, "GBIF_CACHE_PATH", "")
+    return requests
+
+
+@pytest.mark.asyncio
+async def test_concurrent_species_matches_share_a_request(species_match_requests):
+    first, second = await asyncio.gather(
+        resolve_parameters._fetch_species_match("match?name=Puma"),
+        resolve_parameters._fetch_species_match("match?name=Puma"),
+    )
+
+    assert species_match_requests == ["match?name=Puma"]
+    assert first is second
+    assert resolve_parameters._SPECIES_MATCH_PENDING == {}
+
+
+@pytest.mark.asyncio
+async def test_species_match_failures_are_not_cached(species_match_requests):
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await resolve_parameters._fetch_species_match("match?name=fail")
+
+    assert len(species_match_requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_repeat_species_matches_use_the_disk_cache(
+    species_match_requests, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(cache, "GBIF_CACHE_PATH", str(tmp_path / "gbif.sqlite"))
+
+    first = await resolve_parameters._fetch_species_match("match?name=Puma")
+    second = await resolve_parameters._fetch_species_match("match?name=Puma")
+    cache._close_connection()
+
+    assert species_match_requests == ["match?name=Puma"]
+    assert first == second
+
+
+def test_species_matches_work_across_event_loops(species_match_requests):
+    async def fetch_pair():
+        return await asyncio.gather(
+            resolve_parameters._fetch_species_match("match?name=Puma"),
+            resolve_parameters._fetch_species_match("match?name=Puma"),
+        )
+
+    first = asyncio.run(fetch_pair())
+    second = asyncio.run(fetch_pair())
+
+    assert len(species_match_requests) == 2
+    assert first[0] is first[1]
+    assert second[0]["usage"]["key"] == 2
+
+
+class RecordingProcess:
+    def __init__(self):
+        self.logs = []
+        self.artifacts = []
+
+    async def log(self, message, data=None):
+        self.logs.append(message)
+
+    async def create_artifact(self, **kwargs):
+        self.artifacts.append(kwargs["uris"])
+
+
+@pytest.mark.asyncio
+async def test_duplicate_organisms_are_resolved_once(species_match_requests):
+    organisms = [
+        IdentifiedOrganism(
+            term_found=name,
+            is_already_scientific=True,
+            scientific_name=name,
+            taxonomic_rank=rank,
+        )
+        for name, rank in (
+            ("Puma concolor", "species"),
+            ("Lynx rufus", "species"),
+            ("Puma concolor ", " Species"),
+        )
+    ]
+
+    taxon_keys = await resolve_parameters.resolve_names_to_taxonkeys(
+        GbifApi(), organisms, RecordingProcess()
+    )
+
+    assert len(species_match_requests) == 2
+    assert taxon_keys == {("Puma concolor", "species"): 1, ("Lynx rufus", "species"): 2}
+
+
+@pytest.mark.asyncio
+async def test_homonyms_at_different_ranks_keep_both_keys(species_match_requests):
+    organisms = [
+        IdentifiedOrganism(
+            term_found="Morus",
+            is_already_scientific=True,
+            scientific_name="Morus",
+            taxonomic_rank=rank,
+        )
+        for rank in ("genus", "species")
+    ]
+
+    taxon_keys = await resolve_parameters.resolve_names_to_taxonkeys(
+        GbifApi(), organisms, RecordingProcess()
+    )
+
+    assert len(species_match_requests) == 2
+    assert taxon_keys == {("Morus", "genus"): 1, ("Morus", "species"): 2}
+
+
+@pytest.mark.asyncio
+async def test_pending_fields_share_one_extraction(monkeypatch):
+    extractions = []
+
+    async def fake_extract(process, user_request, ranks):
+        extractions.append((user_request, ranks))
+        return resolve_parameters.TaxonomicExtraction(
+            families=["Felidae"], genera=["Puma"]
+        )
+
+    async def fake_resolve_name(api, process, name, expected_rank, artifact_urls):
+        return len(name)
+
+    monkeypatch.setattr(resolve_parameters, "extract_taxonomic_names", fake_extract)
+    monkeypatch.setattr(resolve_parameters, "resolve_name_to_key", fake_resolve_name)
+
+    resolved, unresolved = await resolve_parameters.resolve_pending_search_parameters(
+        ["familyKey", "genusKey", "speciesKey"],
+        "pumas and other cats",
+        GbifApi(),
+        RecordingProcess(),
+    )
+
+    assert extractions == [("pumas and other cats", {"family", "genus", "species"})]
+    assert resolved == {"familyKey": [7], "genusKey": [4]}
+    assert unresolved == ["speciesKey"]
+
+
+@pytest.mark.asyncio
+async def test_field_names_are_resolved_once(monkeypatch):
+    lookups = []
+
+    async def fake_resolve_name(api, process, name, expected_rank, artifact_urls):
+        lookups.append(name)
+        return len(lookups)
+
+    monkeypatch.setattr(resolve_parameters, "resolve_name_to_key", fake_resolve_name)
+    extraction = resolve_parameters.TaxonomicExtraction(
+        species=["Homo sapiens", "homo  sapiens", "Pan troglodytes"]
+    )
+
+    keys = await resolve_parameters.resolve_field_from_request(
+        GbifApi(), RecordingProcess(), "speciesKey", extraction
+    )
+
+    assert lookups == ["Homo sapiens", "Pan troglodytes"]
+    assert keys == [1, 2]
+
+
+def test_extraction_model_only_asks_for_needed_ranks():
+    model = resolve_parameters._extraction_model(("family", "genus"))
+
+    assert list(model.model_json_schema()["properties"]) == [
+        "families",
+        "genera",
+        "note",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_shared_match_urls_are_one_artifact(species_match_requests, monkeypatch):
+    async def fake_extract(process, user_request, ranks):
+        return resolve_parameters.TaxonomicExtraction(
+            families=["Puma"], genera=["Puma"]
+        )
+
+    monkeypatch.setattr(resolve_parameters, "extract_taxonomic_names", fake_extract)
+    process = RecordingProcess()
+
+    await resolve_parameters.resolve_pending_search_parameters(
+        ["familyKey", "genusKey"], "pumas", GbifApi(), process
+    )
+
+    assert len(species_match_requests) == 1
+    assert process.artifacts == [species_match_requests]